@@ -1,17 +1,24 @@
 import asyncio
 import os
 import shutil
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from bson import ObjectId
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.tracing import tracer
 from app.db.database import get_db
 from app.services.analysis_service import AnalysisService
+from app.services.admission_service import AdmissionService
+from app.services.export_service import ExportService, decode_cursor
 from app.schemas.analysis import Analysis, AnalysisCreate
-from typing import List
+from typing import List, Optional
 from app.services.auth_service import get_current_user
 from app.models.user import User
 
 router = APIRouter()
-UPLOAD_DIRECTORY = "/tmp/uploads"
+UPLOAD_DIRECTORY = settings.UPLOAD_DIRECTORY
 
 if not os.path.exists(UPLOAD_DIRECTORY):
     os.makedirs(UPLOAD_DIRECTORY)
@@ -19,28 +26,94 @@ if not os.path.exists(UPLOAD_DIRECTORY):
 def get_analysis_service():
     return AnalysisService()
 
+def get_admission_service():
+    return AdmissionService()
+
+def get_export_service():
+    return ExportService()
+
 @router.post("/", response_model=List[Analysis], response_model_by_alias=False)
 async def create_analysis(
     files: List[UploadFile] = File(...),
+    latency_budget_seconds: Optional[float] = Form(None),
+    cost_budget_usd: Optional[float] = Form(None),
+    parent_id: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user),
-    service: AnalysisService = Depends(get_analysis_service)
+    service: AnalysisService = Depends(get_analysis_service),
+    admission: AdmissionService = Depends(get_admission_service)
 ):
-    async def process_file(file: UploadFile):
-        file_path = os.path.join(UPLOAD_DIRECTORY, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        analysis_data = AnalysisCreate(
-            user_id=current_user.id,
-            file_name=file.filename,
-            s3_path=file_path  # Using s3_path to store local path for now
+    if parent_id:
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="parent_id requires exactly one uploaded file")
+        parent = await service.get_analysis(parent_id) if ObjectId.is_valid(parent_id) else None
+        if not parent or parent.user_id != current_user.id:
+            raise HTTPException(status_code=404, detail="Parent analysis not found")
+
+    decision = await admission.admit(current_user.id, count=len(files))
+    if not decision.admitted and not decision.retryable:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=decision.reason)
+    if not decision.admitted:
+        headers = {}
+        if decision.retry_after_seconds is not None:
+            headers["Retry-After"] = str(decision.retry_after_seconds)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"message": decision.reason, "estimated_wait_seconds": decision.estimated_wait_seconds},
+            headers=headers,
         )
-        return await service.create_analysis(analysis_data)
+
+    async def process_file(file: UploadFile):
+        try:
+            file_path = os.path.join(UPLOAD_DIRECTORY, file.filename)
+            with tracer.start_as_current_span("upload.save") as span:
+                span.set_attribute("upload.file_name", file.filename)
+                with open(file_path, "wb") as buffer:
+                    shutil.copyfileobj(file.file, buffer)
+                span.set_attribute("upload.bytes", os.path.getsize(file_path))
+
+            analysis_data = AnalysisCreate(
+                user_id=current_user.id,
+                file_name=file.filename,
+                s3_path=file_path,  # Using s3_path to store local path for now
+                latency_budget_seconds=latency_budget_seconds,
+                cost_budget_usd=cost_budget_usd,
+                parent_id=parent_id
+            )
+            return await service.create_analysis(analysis_data)
+        except Exception:
+            await admission.release(current_user.id)
+            raise
 
     tasks = [process_file(file) for file in files]
     analyses = await asyncio.gather(*tasks)
     return analyses
 
+@router.get("/export")
+async def export_analyses(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    per_clause: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    service: ExportService = Depends(get_export_service)
+):
+    """
+    Stream the current user's analyses (or one row per clause) as NDJSON or CSV.
+    Every row carries a `cursor`; pass the last one received to resume.
+    """
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "csv":
+        rows = service.iter_csv(current_user.id, start=start, end=end, cursor=cursor, per_clause=per_clause)
+        return StreamingResponse(rows, media_type="text/csv", headers={"Content-Disposition": 'attachment; filename="analyses.csv"'})
+    rows = service.iter_ndjson(current_user.id, start=start, end=end, cursor=cursor, per_clause=per_clause)
+    return StreamingResponse(rows, media_type="application/x-ndjson")
+
 @router.get("/{analysis_id}", response_model=Analysis)
 async def get_analysis(
     analysis_id: str,
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List
+from app.schemas.clause import ClauseSearchResult
+from app.services.auth_service import get_current_user
+from app.services.clause_index_service import ClauseIndexService
+from app.models.user import User
+
+router = APIRouter()
+
+def get_clause_index_service():
+    return ClauseIndexService()
+
+@router.get("/search", response_model=List[ClauseSearchResult])
+async def search_clauses(
+    q: str = Query(..., min_length=1),
+    mode: str = Query("text", pattern="^(text|vector)$"),
+    limit: int = Query(20, ge=1),
+    current_user: User = Depends(get_current_user),
+    service: ClauseIndexService = Depends(get_clause_index_service)
+):
+    return await service.search(current_user.id, q, mode=mode, limit=limit)
@@ -1,9 +1,20 @@
 from fastapi import APIRouter, Depends
-from app.schemas.user import User
+from app.schemas.user import User, UserStats
 from app.services.auth_service import get_current_user
+from app.services.stats_service import StatsService
 
 router = APIRouter()
 
+def get_stats_service():
+    return StatsService()
+
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: User = Depends(get_current_user)):
-    return current_user
\ No newline at end of file
+    return current_user
+
+@router.get("/me/stats", response_model=UserStats)
+async def read_users_me_stats(
+    current_user: User = Depends(get_current_user),
+    service: StatsService = Depends(get_stats_service)
+):
+    return await service.get_stats(current_user.id)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,6 +14,96 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 30
     OPENAI_API_KEY: str
+    UPLOAD_DIRECTORY: str = "/tmp/uploads"
+
+    # LLM model routing. Routes are tried in order, so list the fastest/cheapest
+    # model first; the first route that fits the document and budgets wins.
+    LLM_ROUTES: List[dict] = [
+        {
+            "model": "gpt-3.5-turbo",
+            "max_input_tokens": 12000,
+            "max_output_tokens": 2048,
+            "expected_latency_seconds": 20.0,
+            "cost_per_1k_tokens": 0.0005,
+            "tiers": ["free", "standard", "premium"],
+        },
+        {
+            "model": "gpt-4o-mini",
+            "max_input_tokens": 120000,
+            "max_output_tokens": 4096,
+            "expected_latency_seconds": 60.0,
+            "cost_per_1k_tokens": 0.00015,
+            "tiers": ["free", "standard", "premium"],
+        },
+    ]
+    # Preferred retry model; used only if it is a route the user's tier may use and the document fits.
+    LLM_FALLBACK_MODEL: str = "gpt-4o-mini"
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 120.0
+
+    # Opt-in micro-batching: pack several small documents into one LLM request.
+    LLM_MICROBATCH_ENABLED: bool = False
+    LLM_MICROBATCH_WINDOW_SECONDS: float = 2.0
+    LLM_MICROBATCH_MAX_DOCUMENTS: int = 5
+    LLM_MICROBATCH_MAX_DOCUMENT_TOKENS: int = 2000
+    # Output tokens reserved per document; batches shrink so the reply is never truncated.
+    LLM_MICROBATCH_OUTPUT_TOKENS_PER_DOCUMENT: int = 512
+
+    # Document extraction limits. Text beyond the memory budget is spilled to a temp file.
+    # The character limit is further capped at what the largest LLM route can accept.
+    EXTRACTION_MAX_PAGES: int = 2000
+    EXTRACTION_MAX_CHARS: int = 2_000_000
+    EXTRACTION_MEMORY_BUDGET_BYTES: int = 8 * 1024 * 1024
+
+    # Admission control for the analysis API
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_QUEUE_DEPTH: int = 500
+    ADMISSION_MAX_INFLIGHT_PER_USER: int = 20
+    ADMISSION_INFLIGHT_TTL_SECONDS: int = 6 * 60 * 60
+    ADMISSION_AVG_TASK_SECONDS: float = 30.0
+    RATE_LIMIT_BUCKET_CAPACITY: int = 20
+    RATE_LIMIT_REFILL_PER_SECOND: float = 0.2
+
+    # Celery worker profile. Broker and backend default to REDIS_HOST/REDIS_PORT.
+    CELERY_BROKER_URL: Optional[str] = None
+    CELERY_RESULT_BACKEND: Optional[str] = None
+    CELERY_WORKER_POOL: str = "prefork"
+    CELERY_WORKER_CONCURRENCY: int = 4
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = 1
+    CELERY_WORKER_MAX_TASKS_PER_CHILD: int = 100
+    CELERY_WORKER_MAX_MEMORY_PER_CHILD_KB: int = 512000
+
+    # Queue-depth autoscaler (enabled with `celery worker --autoscale=MAX,MIN`)
+    CELERY_AUTOSCALE_TARGET_DRAIN_SECONDS: float = 60.0
+    CELERY_AUTOSCALE_EXPECTED_NODES: int = 1
+    CELERY_AUTOSCALE_POLL_SECONDS: float = 5.0
+    CELERY_AUTOSCALE_DEFAULT_LATENCY_SECONDS: float = 30.0
+    CELERY_AUTOSCALE_LATENCY_EWMA_ALPHA: float = 0.2
+
+    # Clause search index
+    CLAUSE_EMBEDDING_DIMENSIONS: int = 256
+    CLAUSE_VECTOR_CACHE_SECONDS: int = 300
+    CLAUSE_VECTOR_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    CLAUSE_SEARCH_MAX_LIMIT: int = 100
+
+    # Distributed tracing (OpenTelemetry). Exporter is "otlp", "file" or "console".
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "ai-contracts-manager"
+    TRACING_EXPORTER: str = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE_PATH: str = "/tmp/traces.jsonl"
+
+    # Periodic jobs (run with `celery -A app.worker.celery_app beat`)
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 24 * 60 * 60
+    RETENTION_SWEEP_INTERVAL_SECONDS: int = 10 * 60
+
+    # Retention. Source files are deleted this many hours after an analysis reaches
+    # the given status; analysis documents expire (TTL index) after the given days.
+    RETENTION_ENABLED: bool = True
+    RETENTION_SOURCE_FILE_HOURS: Dict[str, float] = {"COMPLETED": 24, "FAILED": 24, "REJECTED": 1}
+    RETENTION_ANALYSIS_DAYS: Dict[str, float] = {}
+    RETENTION_SWEEP_BATCH_SIZE: int = 100
+    RETENTION_SWEEP_MAX_BATCHES: int = 50
+    RETENTION_SWEEP_MAX_DELETES_PER_SECOND: float = 50.0
     
     # Email configuration
     ENABLE_EMAIL_NOTIFICATIONS: bool = False
@@ -23,6 +114,18 @@ class Settings(BaseSettings):
 
     class Config:
         env_file = ".env"
+
+    @property
+    def redis_url(self) -> str:
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0"
+
+    @property
+    def celery_broker_url(self) -> str:
+        return self.CELERY_BROKER_URL or self.redis_url
+
+    @property
+    def celery_result_backend(self) -> str:
+        return self.CELERY_RESULT_BACKEND or self.redis_url
     
     def validate_email_config(self) -> bool:
         """Validate email configuration and log status."""
@@ -0,0 +1,140 @@
+import functools
+import inspect
+import logging
+import time
+from typing import Dict, Optional, Sequence
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("app")
+
+PUBLISHED_AT_HEADER = "x-published-at"
+_configured = False
+
+
+class FileSpanExporter(SpanExporter):
+    """Append finished spans as JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: Sequence) -> SpanExportResult:
+        try:
+            with open(self.path, "a") as f:
+                for span in spans:
+                    f.write(span.to_json(indent=None) + "\n")
+            return SpanExportResult.SUCCESS
+        except OSError as e:
+            logger.error(f"Failed to write spans to {self.path}: {str(e)}")
+            return SpanExportResult.FAILURE
+
+
+class TraceContextFilter(logging.Filter):
+    """Stamp log records with the current trace id so logs can be joined to traces."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span_context = trace.get_current_span().get_span_context()
+        record.trace_id = format(span_context.trace_id, "032x") if span_context.is_valid else "-"
+        return True
+
+
+def add_trace_filter(target: logging.Logger) -> None:
+    """Make %(trace_id)s available to every handler of a logger."""
+    for handler in target.handlers:
+        if not any(isinstance(f, TraceContextFilter) for f in handler.filters):
+            handler.addFilter(TraceContextFilter())
+
+
+def _build_exporter() -> SpanExporter:
+    if settings.TRACING_EXPORTER == "file":
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+    if settings.TRACING_EXPORTER == "console":
+        return ConsoleSpanExporter()
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+
+def setup_tracing(component: str) -> None:
+    """Configure the tracer provider for this process. Safe to call repeatedly."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    if not settings.TRACING_ENABLED:
+        return
+    provider = TracerProvider(resource=Resource.create({
+        "service.name": settings.TRACING_SERVICE_NAME,
+        "service.component": component,
+    }))
+    provider.add_span_processor(BatchSpanProcessor(_build_exporter()))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing enabled for {component} with {settings.TRACING_EXPORTER} exporter")
+
+
+def traced(name: Optional[str] = None):
+    """Wrap a sync or async function in a span named after it."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_celery() -> None:
+    """
+    Propagate trace context from the publisher to the worker through Celery
+    message headers, and run each task inside a span parented to it.
+    """
+    from celery import signals
+
+    active: Dict[str, tuple] = {}
+
+    @signals.before_task_publish.connect(weak=False)
+    def inject_context(headers=None, **kwargs):
+        if headers is None:
+            return
+        propagate.inject(headers)
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+    @signals.task_prerun.connect(weak=False)
+    def start_task_span(task_id=None, task=None, **kwargs):
+        request = task.request
+        carrier = {key: getattr(request, key) for key in propagate.get_global_textmap().fields if getattr(request, key, None)}
+        span = tracer.start_span(f"celery.task {task.name}", context=propagate.extract(carrier), kind=trace.SpanKind.CONSUMER)
+        span.set_attribute("celery.task_id", task_id)
+        published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+        if published_at:
+            span.set_attribute("celery.queue_wait_seconds", max(0.0, time.time() - float(published_at)))
+        token = context.attach(trace.set_span_in_context(span))
+        active[task_id] = (span, token)
+
+    @signals.task_postrun.connect(weak=False)
+    def end_task_span(task_id=None, state=None, **kwargs):
+        span, token = active.pop(task_id, (None, None))
+        if span is None:
+            return
+        if state:
+            span.set_attribute("celery.state", state)
+        span.end()
+        context.detach(token)
@@ -0,0 +1,22 @@
+import logging
+from app.db.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+async def ensure_indexes():
+    """Create the indexes the API and worker queries rely on. Safe to run on every startup."""
+    analyses = await get_collection("analyses")
+    await analyses.create_index([("user_id", 1), ("_id", 1)])
+    # Retention: the sweeper scans by status and time in that status, and documents
+    # with expires_at set are removed by Mongo.
+    await analyses.create_index([("status", 1), ("status_changed_at", 1)])
+    await analyses.create_index([("status", 1), ("updated_at", 1)])
+    await analyses.create_index("s3_path")
+    await analyses.create_index("expires_at", expireAfterSeconds=0)
+
+    clauses = await get_collection("clauses")
+    await clauses.create_index([("user_id", 1), ("normalized_text", "text")])
+    await clauses.create_index([("user_id", 1), ("_id", 1)])
+    await clauses.create_index("analysis_id")
+    await clauses.create_index("expires_at", expireAfterSeconds=0)
+    logger.info("Database indexes ensured")
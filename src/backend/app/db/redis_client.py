@@ -0,0 +1,19 @@
+import redis
+import redis.asyncio as aioredis
+from typing import Dict, Optional
+from app.core.config import settings
+
+_async_clients: Dict[str, aioredis.Redis] = {}
+_sync_clients: Dict[str, redis.Redis] = {}
+
+def get_redis(url: Optional[str] = None) -> aioredis.Redis:
+    url = url or settings.redis_url
+    if url not in _async_clients:
+        _async_clients[url] = aioredis.from_url(url, decode_responses=True)
+    return _async_clients[url]
+
+def get_sync_redis(url: Optional[str] = None) -> redis.Redis:
+    url = url or settings.redis_url
+    if url not in _sync_clients:
+        _sync_clients[url] = redis.Redis.from_url(url, decode_responses=True)
+    return _sync_clients[url]
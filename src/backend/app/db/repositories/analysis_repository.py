@@ -1,6 +1,37 @@
 from app.db.repository import BaseRepository
 from app.models.analysis import ContractAnalysis
+from bson import ObjectId
+from datetime import datetime
+from typing import AsyncIterator, Optional
 
 class AnalysisRepository(BaseRepository[ContractAnalysis]):
     def __init__(self):
-        super().__init__(collection_name="analyses", model=ContractAnalysis)
\ No newline at end of file
+        super().__init__(collection_name="analyses", model=ContractAnalysis)
+
+    async def iter_for_user(
+        self,
+        user_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        from_id: Optional[ObjectId] = None,
+        inclusive: bool = False,
+        batch_size: int = 500,
+    ) -> AsyncIterator[ContractAnalysis]:
+        """
+        Iterate a user's analyses in _id order, fetching from Mongo in batches so
+        memory stays constant regardless of how many documents match.
+        """
+        query = {"user_id": user_id}
+        if start or end:
+            query["created_at"] = {}
+            if start:
+                query["created_at"]["$gte"] = start
+            if end:
+                query["created_at"]["$lt"] = end
+        if from_id is not None:
+            query["_id"] = {"$gte" if inclusive else "$gt": from_id}
+
+        collection = await self._get_collection()
+        cursor = collection.find(query).sort("_id", 1).batch_size(batch_size)
+        async for document in cursor:
+            yield self.model(**document)
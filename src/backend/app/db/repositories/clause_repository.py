@@ -0,0 +1,56 @@
+from app.db.repository import BaseRepository, db_span
+from app.models.clause import ClauseRecord
+from bson import ObjectId
+from typing import AsyncIterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ClauseRepository(BaseRepository[ClauseRecord]):
+    def __init__(self):
+        super().__init__(collection_name="clauses", model=ClauseRecord)
+
+    @db_span
+    async def replace_for_analysis(self, analysis_id: str, records: List[ClauseRecord]) -> None:
+        """Replace all indexed clauses of an analysis, e.g. when it is re-analyzed."""
+        collection = await self._get_collection()
+        await collection.delete_many({"analysis_id": analysis_id})
+        if records:
+            await collection.insert_many([record.model_dump(by_alias=True) for record in records])
+
+    @db_span
+    async def text_search(self, user_id: str, query: str, limit: int) -> List[Tuple[ClauseRecord, float]]:
+        collection = await self._get_collection()
+        cursor = collection.find(
+            {"user_id": user_id, "$text": {"$search": query}},
+            {"score": {"$meta": "textScore"}, "embedding": 0},
+        ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+        results = []
+        async for document in cursor:
+            record = self.model(**document)
+            results.append((record, document["score"]))
+        return results
+
+    @db_span
+    async def latest_id(self, user_id: str) -> Optional[ObjectId]:
+        collection = await self._get_collection()
+        document = await collection.find_one({"user_id": user_id}, {"_id": 1}, sort=[("_id", -1)])
+        return document["_id"] if document else None
+
+    async def iter_embeddings(
+        self, user_id: str, after_id: Optional[ObjectId] = None, batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        """Iterate a user's clause embeddings in _id order, optionally only those newer than after_id."""
+        query = {"user_id": user_id, "embedding": {"$ne": None}}
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        collection = await self._get_collection()
+        cursor = collection.find(query, {"_id": 1, "embedding": 1}).sort("_id", 1).batch_size(batch_size)
+        async for document in cursor:
+            yield document
+
+    @db_span
+    async def get_many(self, ids: List[ObjectId]) -> List[ClauseRecord]:
+        collection = await self._get_collection()
+        documents = {doc["_id"]: doc async for doc in collection.find({"_id": {"$in": ids}}, {"embedding": 0})}
+        return [self.model(**documents[id]) for id in ids if id in documents]
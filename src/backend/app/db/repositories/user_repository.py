@@ -1,4 +1,4 @@
-from app.db.repository import BaseRepository
+from app.db.repository import BaseRepository, db_span
 from app.models.user import User
 from typing import Optional
 import logging
@@ -9,12 +9,15 @@ class UserRepository(BaseRepository[User]):
     def __init__(self):
         super().__init__(collection_name="users", model=User)
 
+    @db_span
     async def get_by_username(self, db, *, username: str) -> Optional[User]:
         collection = await self._get_collection()
         user_data = await collection.find_one({"username": username})
         if user_data:
             return User(**user_data)
         return None
+
+    @db_span
     async def get_by_id(self, user_id: str) -> Optional[User]:
         logger.info(f"Getting user by id: {user_id}")
         try:
@@ -0,0 +1,34 @@
+from app.db.repository import BaseRepository, db_span
+from app.models.user_stats import UserStats
+from datetime import datetime
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UserStatsRepository(BaseRepository[UserStats]):
+    def __init__(self):
+        super().__init__(collection_name="user_stats", model=UserStats)
+
+    @db_span
+    async def get_by_user_id(self, user_id: str) -> Optional[UserStats]:
+        collection = await self._get_collection()
+        stats_data = await collection.find_one({"_id": user_id})
+        if stats_data:
+            return UserStats(**stats_data)
+        return None
+
+    @db_span
+    async def increment(self, user_id: str, inc: dict) -> None:
+        """Atomically apply counter deltas, creating the stats document if needed."""
+        collection = await self._get_collection()
+        await collection.update_one(
+            {"_id": user_id},
+            {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    @db_span
+    async def replace(self, stats: UserStats) -> None:
+        collection = await self._get_collection()
+        await collection.replace_one({"_id": stats.user_id}, stats.model_dump(by_alias=True), upsert=True)
@@ -1,4 +1,6 @@
+import functools
 from motor.motor_asyncio import AsyncIOMotorCollection
+from app.core.tracing import tracer
 from app.db.database import get_collection
 from bson import ObjectId
 from typing import Type, TypeVar, Generic, List, Optional
@@ -9,6 +11,16 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
 
+def db_span(func):
+    """Trace a repository coroutine as a MongoDB operation on the repository's collection."""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        with tracer.start_as_current_span(f"mongo.{self.collection_name}.{func.__name__}") as span:
+            span.set_attribute("db.system", "mongodb")
+            span.set_attribute("db.mongodb.collection", self.collection_name)
+            return await func(self, *args, **kwargs)
+    return wrapper
+
 class BaseRepository(Generic[T]):
     def __init__(self, collection_name: str, model: Type[T]):
         self.collection_name = collection_name
@@ -25,6 +37,7 @@ class BaseRepository(Generic[T]):
             logger.error(f"Collection error type: {type(e).__name__}")
             raise
 
+    @db_span
     async def get(self, id: str) -> Optional[T]:
         logger.info(f"Getting document with id: {id} from collection: {self.collection_name}")
         try:
@@ -42,23 +55,28 @@ class BaseRepository(Generic[T]):
             logger.error(f"Get error type: {type(e).__name__}")
             raise
 
+    @db_span
     async def get_all(self) -> List[T]:
         collection = await self._get_collection()
         return [self.model(**doc) async for doc in collection.find()]
 
+    @db_span
     async def create(self, data: T) -> T:
         collection = await self._get_collection()
         await collection.insert_one(data.model_dump(by_alias=True))
         return data
 
+    @db_span
     async def update(self, id: str, data: BaseModel) -> Optional[T]:
         logger.info(f"Updating document with id: {id} in collection: {self.collection_name}")
         try:
             collection = await self._get_collection()
             logger.info(f"Performing update operation for id: {id}")
-            result = await collection.update_one(
-                {"_id": ObjectId(id)}, {"$set": data.model_dump(exclude_unset=True)}
-            )
+            changes = data.model_dump(exclude_unset=True)
+            # updated_at comes from a default factory, so exclude_unset would drop it.
+            if "updated_at" in type(data).model_fields:
+                changes["updated_at"] = data.updated_at
+            result = await collection.update_one({"_id": ObjectId(id)}, {"$set": changes})
             logger.info(f"Update operation completed. Modified count: {result.modified_count}")
             return await self.get(id)
         except Exception as e:
@@ -66,6 +84,7 @@ class BaseRepository(Generic[T]):
             logger.error(f"Update error type: {type(e).__name__}")
             raise
 
+    @db_span
     async def delete(self, id: str) -> bool:
         collection = await self._get_collection()
         result = await collection.delete_one({"_id": ObjectId(id)})
@@ -1,20 +1,46 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from opentelemetry import propagate, trace
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import analyses, users, auth
+from app.api.v1 import analyses, users, auth, clauses
 from app.db.database import client, db
+from app.db.indexes import ensure_indexes
+from app.core.tracing import setup_tracing, tracer
 from contextlib import asynccontextmanager
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # on startup
+    await ensure_indexes()
     yield
     # on shutdown
     client.close()
 
 
+setup_tracing("api")
+
 app = FastAPI(lifespan=lifespan)
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Continue the caller's trace (or start one) and return its id in X-Trace-Id."""
+    with tracer.start_as_current_span(
+        f"{request.method} {request.url.path}",
+        context=propagate.extract(request.headers),
+        kind=trace.SpanKind.SERVER,
+    ) as span:
+        span.set_attribute("http.method", request.method)
+        span.set_attribute("http.target", request.url.path)
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            span.update_name(f"{request.method} {route.path}")
+        span.set_attribute("http.status_code", response.status_code)
+        span_context = span.get_span_context()
+        if span_context.is_valid:
+            response.headers["X-Trace-Id"] = format(span_context.trace_id, "032x")
+        return response
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +53,7 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(analyses.router, prefix="/api/v1/analyses", tags=["analyses"])
+app.include_router(clauses.router, prefix="/api/v1/clauses", tags=["clauses"])
 
 @app.get("/")
 def read_root():
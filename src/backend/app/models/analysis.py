@@ -9,6 +9,7 @@ class AnalysisStatus:
     IN_PROGRESS = "IN_PROGRESS"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
+    REJECTED = "REJECTED"
 
 class ContractAnalysis(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -17,6 +18,14 @@ class ContractAnalysis(BaseModel):
     s3_path: str
     status: str = Field(default=AnalysisStatus.PENDING)
     result: Optional[dict] = None
+    model_used: Optional[str] = None
+    latency_budget_seconds: Optional[float] = None
+    cost_budget_usd: Optional[float] = None
+    parent_id: Optional[str] = None
+    version: int = 1
+    source_deleted_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    status_changed_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -33,6 +42,9 @@ class ContractAnalysis(BaseModel):
                 "s3_path": "s3://my-bucket/contracts/contract.pdf",
                 "status": "COMPLETED",
                 "result": {"summary": "This is a summary.", "clauses": []},
+                "model_used": "gpt-3.5-turbo",
+                "parent_id": None,
+                "version": 1,
                 "created_at": "2025-08-11T10:00:00Z",
                 "updated_at": "2025-08-11T10:05:00Z"
             }
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from bson import ObjectId
+from app.models.custom_types import PyObjectId
+
+class ClauseRecord(BaseModel):
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    user_id: str
+    analysis_id: str
+    file_name: str
+    position: int
+    text: str
+    normalized_text: str
+    embedding: Optional[List[float]] = None
+    expires_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        from_attributes = True
+        validate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+        json_schema_extra = {
+            "example": {
+                "_id": "60d5ec49e7afde3a_dummy_id_for_example",
+                "user_id": "user123",
+                "analysis_id": "60d5ec49e7afde3a_dummy_id_for_example",
+                "file_name": "contract.pdf",
+                "position": 3,
+                "text": "Supplier shall indemnify Customer without limit.",
+                "normalized_text": "supplier shall indemnify customer without limit",
+                "created_at": "2025-08-11T10:05:00Z"
+            }
+        }
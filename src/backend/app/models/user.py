@@ -6,6 +6,7 @@ class User(BaseModel):
     username: str
     email: EmailStr
     hashed_password: str
+    tier: str = "standard"
 
     class Config:
         from_attributes = True
@@ -14,6 +15,7 @@ class User(BaseModel):
                 "id": "user123",
                 "username": "johndoe",
                 "email": "johndoe@example.com",
-                "hashed_password": "a_very_secure_password_hash"
+                "hashed_password": "a_very_secure_password_hash",
+                "tier": "standard"
             }
         }
\ No newline at end of file
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Dict
+from datetime import datetime
+
+class UserStats(BaseModel):
+    user_id: str = Field(alias="_id")
+    total: int = 0
+    by_status: Dict[str, int] = Field(default_factory=dict)
+    by_month: Dict[str, int] = Field(default_factory=dict)
+    turnaround_count: int = 0
+    turnaround_seconds_total: float = 0.0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        from_attributes = True
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "_id": "user123",
+                "total": 42,
+                "by_status": {"PENDING": 1, "IN_PROGRESS": 2, "COMPLETED": 38, "FAILED": 1},
+                "by_month": {"2025-08": 12},
+                "turnaround_count": 38,
+                "turnaround_seconds_total": 1710.0,
+                "updated_at": "2025-08-11T10:05:00Z"
+            }
+        }
@@ -10,10 +10,16 @@ class AnalysisBase(BaseModel):
 class AnalysisCreate(AnalysisBase):
     user_id: str
     s3_path: str
+    latency_budget_seconds: Optional[float] = None
+    cost_budget_usd: Optional[float] = None
+    parent_id: Optional[str] = None
 
 class AnalysisUpdate(BaseModel):
     status: Optional[str] = None
     result: Optional[dict] = None
+    model_used: Optional[str] = None
+    expires_at: Optional[datetime] = None
+    status_changed_at: Optional[datetime] = None
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class AnalysisInDB(AnalysisBase):
@@ -22,6 +28,14 @@ class AnalysisInDB(AnalysisBase):
     s3_path: str
     status: str
     result: Optional[dict] = None
+    model_used: Optional[str] = None
+    latency_budget_seconds: Optional[float] = None
+    cost_budget_usd: Optional[float] = None
+    parent_id: Optional[str] = None
+    version: int = 1
+    source_deleted_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    status_changed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
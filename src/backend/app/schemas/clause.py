@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class ClauseSearchResult(BaseModel):
+    id: str
+    analysis_id: str
+    file_name: str
+    position: int
+    text: str
+    score: Optional[float] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Dict, Optional
 
 class UserBase(BaseModel):
     username: str
@@ -26,4 +26,10 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+
+class UserStats(BaseModel):
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    average_turnaround_seconds: Optional[float] = None
+    contracts_this_month: int = 0
@@ -0,0 +1,158 @@
+import logging
+import math
+import time
+from typing import Optional
+from pydantic import BaseModel
+from app.core.config import settings
+from app.db.redis_client import get_redis, get_sync_redis
+from app.worker.autoscale import ANALYSIS_QUEUE
+
+logger = logging.getLogger(__name__)
+
+INFLIGHT_KEY = "admission:inflight:{user_id}"
+BUCKET_KEY = "admission:bucket:{user_id}"
+
+# Refill the user's bucket for the time elapsed since the last call, then try to
+# take the requested tokens. Returns {allowed, seconds_until_enough_tokens}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+class AdmissionDecision(BaseModel):
+    admitted: bool
+    # False when retrying the same request can never succeed.
+    retryable: bool = True
+    reason: Optional[str] = None
+    retry_after_seconds: Optional[int] = None
+    estimated_wait_seconds: Optional[int] = None
+
+
+class AdmissionService:
+    def __init__(self):
+        self.redis = get_redis()
+        self.broker = get_redis(settings.celery_broker_url)
+        self.enabled = settings.ADMISSION_CONTROL_ENABLED
+        self.max_queue_depth = settings.ADMISSION_MAX_QUEUE_DEPTH
+        self.max_inflight = settings.ADMISSION_MAX_INFLIGHT_PER_USER
+        self.bucket_capacity = settings.RATE_LIMIT_BUCKET_CAPACITY
+        self.refill_rate = settings.RATE_LIMIT_REFILL_PER_SECOND
+
+    def estimate_wait_seconds(self, queue_depth: int) -> int:
+        """Estimate how long a newly queued analysis waits before a worker picks it up."""
+        concurrency = max(1, settings.CELERY_WORKER_CONCURRENCY * settings.CELERY_AUTOSCALE_EXPECTED_NODES)
+        return int(math.ceil(queue_depth * settings.ADMISSION_AVG_TASK_SECONDS / concurrency))
+
+    async def get_queue_depth(self) -> int:
+        return await self.broker.llen(ANALYSIS_QUEUE)
+
+    async def admit(self, user_id: str, count: int = 1) -> AdmissionDecision:
+        """
+        Reserve capacity for `count` new analyses for a user. On success the
+        user's in-flight counter is incremented and must be released by the worker.
+        """
+        if not self.enabled:
+            return AdmissionDecision(admitted=True)
+
+        if count > self.bucket_capacity:
+            return AdmissionDecision(
+                admitted=False,
+                retryable=False,
+                reason=f"At most {self.bucket_capacity} files can be uploaded per request",
+            )
+
+        try:
+            # 1. Global queue depth
+            queue_depth = await self.get_queue_depth()
+            if queue_depth + count > self.max_queue_depth:
+                wait = self.estimate_wait_seconds(queue_depth)
+                logger.warning(f"Rejecting {count} analyses for user {user_id}: queue depth {queue_depth}")
+                return AdmissionDecision(
+                    admitted=False,
+                    reason="Analysis queue is at capacity",
+                    retry_after_seconds=max(1, wait),
+                    estimated_wait_seconds=wait,
+                )
+
+            # 2. Per-user in-flight analyses
+            inflight_key = INFLIGHT_KEY.format(user_id=user_id)
+            inflight = await self.redis.incrby(inflight_key, count)
+            await self.redis.expire(inflight_key, settings.ADMISSION_INFLIGHT_TTL_SECONDS)
+            if inflight > self.max_inflight:
+                await self.redis.decrby(inflight_key, count)
+                wait = int(math.ceil(settings.ADMISSION_AVG_TASK_SECONDS))
+                logger.warning(f"Rejecting {count} analyses for user {user_id}: {inflight - count} already in flight")
+                return AdmissionDecision(
+                    admitted=False,
+                    reason=f"Too many analyses in progress (limit {self.max_inflight})",
+                    retry_after_seconds=max(1, wait),
+                    estimated_wait_seconds=self.estimate_wait_seconds(queue_depth),
+                )
+
+            # 3. Per-user token bucket rate limit
+            allowed, wait = await self.redis.eval(
+                TOKEN_BUCKET_SCRIPT,
+                1,
+                BUCKET_KEY.format(user_id=user_id),
+                self.bucket_capacity,
+                self.refill_rate,
+                time.time(),
+                count,
+            )
+            if not int(allowed):
+                await self.redis.decrby(inflight_key, count)
+                retry_after = max(1, int(math.ceil(float(wait))))
+                logger.warning(f"Rate limiting user {user_id}: retry after {retry_after}s")
+                return AdmissionDecision(
+                    admitted=False,
+                    reason="Rate limit exceeded",
+                    retry_after_seconds=retry_after,
+                    estimated_wait_seconds=self.estimate_wait_seconds(queue_depth),
+                )
+
+            return AdmissionDecision(admitted=True, estimated_wait_seconds=self.estimate_wait_seconds(queue_depth))
+        except Exception as e:
+            # Redis is also the broker, so if it is down the enqueue will surface the error.
+            logger.error(f"Admission check failed for user {user_id}, admitting: {str(e)}")
+            logger.error(f"Admission error type: {type(e).__name__}")
+            return AdmissionDecision(admitted=True)
+
+    async def release(self, user_id: str, count: int = 1) -> None:
+        """Give back in-flight capacity that was admitted but never enqueued."""
+        if not self.enabled:
+            return
+        try:
+            await self.redis.decrby(INFLIGHT_KEY.format(user_id=user_id), count)
+        except Exception as e:
+            logger.error(f"Failed to release in-flight capacity for user {user_id}: {str(e)}")
+
+
+def release_inflight(user_id: str) -> None:
+    """Release one in-flight slot from a worker process when an analysis finishes."""
+    if not settings.ADMISSION_CONTROL_ENABLED:
+        return
+    try:
+        client = get_sync_redis()
+        key = INFLIGHT_KEY.format(user_id=user_id)
+        if client.decr(key) < 0:
+            client.set(key, 0, ex=settings.ADMISSION_INFLIGHT_TTL_SECONDS)
+    except Exception as e:
+        logger.error(f"Failed to release in-flight slot for user {user_id}: {str(e)}")
@@ -1,15 +1,22 @@
 from app.db.repositories.analysis_repository import AnalysisRepository
 from app.schemas.analysis import AnalysisCreate, Analysis
 from app.models.analysis import ContractAnalysis
+from app.services.stats_service import StatsService
 from app.worker.tasks import analyze_contract
 
 class AnalysisService:
     def __init__(self):
         self.repository = AnalysisRepository()
+        self.stats = StatsService()
 
     async def create_analysis(self, analysis_data: AnalysisCreate) -> Analysis:
         analysis = ContractAnalysis(**analysis_data.model_dump())
+        if analysis.parent_id:
+            parent = await self.repository.get(analysis.parent_id)
+            if parent:
+                analysis.version = parent.version + 1
         created_analysis = await self.repository.create(analysis)
+        await self.stats.record_created(analysis.user_id, analysis.created_at)
         analyze_contract.delay(analysis_id=str(analysis.id), user_id=str(analysis.user_id))
         return Analysis.model_validate(created_analysis)
 
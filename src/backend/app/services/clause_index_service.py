@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+import numpy as np
+from bson import ObjectId
+from app.core.config import settings
+from app.db.repositories.clause_repository import ClauseRepository
+from app.models.analysis import ContractAnalysis
+from app.models.clause import ClauseRecord
+from app.schemas.clause import ClauseSearchResult
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def clause_text(clause) -> str:
+    """Flatten an LLM clause (a string or an object of fields) into display text."""
+    if isinstance(clause, str):
+        return clause
+    if isinstance(clause, dict):
+        return " ".join(str(value) for value in clause.values() if isinstance(value, (str, int, float)))
+    return json.dumps(clause, default=str)
+
+
+def normalize_clause(text: str) -> str:
+    return " ".join(TOKEN.findall(text.lower()))
+
+
+def embed(text: str, dimensions: Optional[int] = None) -> np.ndarray:
+    """
+    Locally computed embedding: unigrams and bigrams hashed into a fixed-size
+    signed vector, L2-normalized so a dot product is cosine similarity.
+    """
+    dimensions = dimensions or settings.CLAUSE_EMBEDDING_DIMENSIONS
+    vector = np.zeros(dimensions, dtype=np.float32)
+    tokens = normalize_clause(text).split()
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+        vector[digest % dimensions] += 1.0 if (digest >> 63) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _UserVectors:
+    def __init__(self, ids: List[ObjectId], matrix: np.ndarray, latest_id: Optional[ObjectId]):
+        self.ids = ids
+        self.matrix = matrix
+        self.latest_id = latest_id
+        self.loaded_at = time.monotonic()
+
+    def extend(self, ids: List[ObjectId], matrix: np.ndarray, latest_id: Optional[ObjectId]) -> None:
+        if ids:
+            self.matrix = np.vstack([self.matrix, matrix]) if self.ids else matrix
+            self.ids = self.ids + ids
+        self.latest_id = latest_id
+
+
+# Per-process LRU cache of each user's clause embedding matrix, bounded by
+# CLAUSE_VECTOR_CACHE_MAX_BYTES.
+_vector_cache: "OrderedDict[str, _UserVectors]" = OrderedDict()
+
+
+def _cache_vectors(user_id: str, vectors: _UserVectors) -> None:
+    _vector_cache[user_id] = vectors
+    _vector_cache.move_to_end(user_id)
+    total = sum(v.matrix.nbytes for v in _vector_cache.values())
+    while total > settings.CLAUSE_VECTOR_CACHE_MAX_BYTES and len(_vector_cache) > 1:
+        evicted_user, evicted = _vector_cache.popitem(last=False)
+        total -= evicted.matrix.nbytes
+        logger.info(f"Evicted clause embeddings for user {evicted_user} from the vector cache")
+
+
+class ClauseIndexService:
+    def __init__(self):
+        self.repository = ClauseRepository()
+
+    async def index_analysis(self, analysis: ContractAnalysis, result: dict, expires_at: Optional[datetime] = None) -> int:
+        """Store each clause of a completed analysis as its own searchable record."""
+        records = []
+        for position, clause in enumerate(result.get("clauses") or []):
+            text = clause_text(clause)
+            if not text.strip():
+                continue
+            records.append(ClauseRecord(
+                user_id=analysis.user_id,
+                analysis_id=str(analysis.id),
+                file_name=analysis.file_name,
+                position=position,
+                text=text,
+                normalized_text=normalize_clause(text),
+                embedding=embed(text).tolist(),
+                expires_at=expires_at,
+            ))
+        await self.repository.replace_for_analysis(str(analysis.id), records)
+        logger.info(f"Indexed {len(records)} clauses for analysis {analysis.id}")
+        return len(records)
+
+    async def _read_embeddings(self, user_id: str, after_id: Optional[ObjectId] = None) -> Tuple[List[ObjectId], np.ndarray]:
+        ids, rows = [], []
+        async for document in self.repository.iter_embeddings(user_id, after_id=after_id):
+            ids.append(document["_id"])
+            rows.append(document["embedding"])
+        if not rows:
+            return ids, np.empty((0, settings.CLAUSE_EMBEDDING_DIMENSIONS), dtype=np.float32)
+        return ids, np.asarray(rows, dtype=np.float32)
+
+    async def _load_vectors(self, user_id: str) -> _UserVectors:
+        """
+        Return the user's embedding matrix. New clauses are appended to a cached
+        matrix; the whole set is reloaded only once it is older than
+        CLAUSE_VECTOR_CACHE_SECONDS, which also drops clauses deleted since.
+        """
+        latest_id = await self.repository.latest_id(user_id)
+        cached = _vector_cache.get(user_id)
+        if cached and time.monotonic() - cached.loaded_at < settings.CLAUSE_VECTOR_CACHE_SECONDS:
+            if cached.latest_id == latest_id:
+                _vector_cache.move_to_end(user_id)
+                return cached
+            if cached.latest_id is not None and latest_id is not None and latest_id > cached.latest_id:
+                ids, matrix = await self._read_embeddings(user_id, after_id=cached.latest_id)
+                # Track the last clause actually read: one inserted after latest_id()
+                # was queried is already in this batch and must not be appended again.
+                cached.extend(ids, matrix, ids[-1] if ids else cached.latest_id)
+                _cache_vectors(user_id, cached)
+                logger.info(f"Appended {len(ids)} clause embeddings for user {user_id}")
+                return cached
+
+        ids, matrix = await self._read_embeddings(user_id)
+        vectors = _UserVectors(ids, matrix, ids[-1] if ids else None)
+        _cache_vectors(user_id, vectors)
+        logger.info(f"Loaded {len(ids)} clause embeddings for user {user_id}")
+        return vectors
+
+    async def search(self, user_id: str, query: str, mode: str = "text", limit: int = 20) -> List[ClauseSearchResult]:
+        limit = max(1, min(limit, settings.CLAUSE_SEARCH_MAX_LIMIT))
+        if mode == "vector":
+            matches = await self._vector_search(user_id, query, limit)
+        else:
+            matches = await self.repository.text_search(user_id, query, limit)
+        return [
+            ClauseSearchResult(
+                id=str(record.id),
+                analysis_id=record.analysis_id,
+                file_name=record.file_name,
+                position=record.position,
+                text=record.text,
+                score=float(score),
+            )
+            for record, score in matches
+        ]
+
+    async def _vector_search(self, user_id: str, query: str, limit: int) -> List[Tuple[ClauseRecord, float]]:
+        vectors = await self._load_vectors(user_id)
+        if not vectors.ids:
+            return []
+        query_vector = embed(query, vectors.matrix.shape[1])
+        scores = vectors.matrix @ query_vector
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        records = await self.repository.get_many([vectors.ids[i] for i in top])
+        score_by_id = {vectors.ids[i]: scores[i] for i in top}
+        return [(record, score_by_id[record.id]) for record in records]
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# Lines that open a new section: "1.", "12.3", "ARTICLE IV", "Section 5", "SCHEDULE A".
+SECTION_HEADING = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*\.?\s+\S|(?:article|section|schedule|exhibit|annex)\s+[\w.]+)",
+    re.IGNORECASE,
+)
+# Sections longer than this are split on paragraph boundaries so a one-word
+# edit in a long section does not force the whole section back to the LLM.
+MAX_SECTION_CHARS = 4000
+
+
+def _split_long(section: str) -> List[str]:
+    if len(section) <= MAX_SECTION_CHARS:
+        return [section]
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", section):
+        if current and len(current) + len(paragraph) > MAX_SECTION_CHARS:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_sections(text: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Split contract text into sections on clause headings, falling back to
+    paragraph blocks. Accepts a string or an iterable of lines.
+    """
+    lines = text.splitlines() if isinstance(text, str) else text
+    sections, current = [], []
+    for line in lines:
+        if SECTION_HEADING.match(line) and any(l.strip() for l in current):
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if any(l.strip() for l in current):
+        sections.append("\n".join(current).strip())
+
+    result = []
+    for section in sections:
+        result.extend(_split_long(section))
+    return [s for s in result if s.strip()]
+
+
+def section_hash(section: str) -> str:
+    """Hash a section on its normalized text so whitespace and case changes are ignored."""
+    normalized = " ".join(section.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def build_analysis_prompt(sections: List[Tuple[int, str]], previous_summary: Optional[str] = None) -> str:
+    """Build the LLM prompt for the given (section number, text) pairs."""
+    body = "\n\n".join(f"[Section {number}]\n{text}" for number, text in sections)
+    if previous_summary is None:
+        intro = (
+            "Analyze the following contract and return your analysis in JSON format.\n"
+            "The contract is split into numbered sections marked [Section N]."
+        )
+        summary_spec = '- "summary": A brief summary of the contract.'
+    else:
+        intro = (
+            "Analyze the changed sections of a revised contract and return your analysis in JSON format.\n"
+            "Only the sections that changed since the previous version are included, marked [Section N].\n"
+            f"Summary of the previous version: {previous_summary}"
+        )
+        summary_spec = '- "summary": A brief summary of the revised contract as a whole, updated for these changes.'
+
+    return f"""
+{intro}
+The JSON object should have two keys: "summary" and "sections".
+{summary_spec}
+- "sections": An object mapping each section number (as a string) to a list of key clauses found in that section.
+
+Contract Text:
+{body}
+"""
+
+
+def reusable_sections(previous_result: Optional[dict]) -> Dict[str, list]:
+    """Map section hash to clause analysis from a previous version's result."""
+    if not previous_result:
+        return {}
+    return {
+        section["hash"]: section["clauses"]
+        for section in previous_result.get("sections") or []
+        if section.get("hash") and section.get("clauses") is not None
+    }
+
+
+def assemble_result(
+    parsed: dict,
+    hashes: List[str],
+    analyzed: List[int],
+    reused: Dict[int, list],
+) -> dict:
+    """
+    Combine the LLM's per-section clauses with clauses reused from the previous
+    version into a result with a flat "clauses" list and per-section hashes.
+    """
+    llm_sections = parsed.get("sections")
+    if not isinstance(llm_sections, dict):
+        # The model ignored the section layout; keep its clauses but do not
+        # record them per section, so the next version re-analyzes everything.
+        clauses = list(parsed.get("clauses") or [])
+        for number in sorted(reused):
+            clauses.extend(reused[number])
+        return {
+            "summary": parsed.get("summary"),
+            "clauses": clauses,
+            "sections": [{"hash": h, "clauses": None} for h in hashes],
+        }
+
+    sections, clauses = [], []
+    for number, hash_ in enumerate(hashes, start=1):
+        if number in reused:
+            section_clauses = reused[number]
+        elif number in analyzed:
+            section_clauses = llm_sections.get(str(number)) or []
+            if not isinstance(section_clauses, list):
+                section_clauses = [section_clauses]
+        else:
+            section_clauses = []
+        sections.append({"hash": hash_, "clauses": section_clauses})
+        clauses.extend(section_clauses)
+
+    return {"summary": parsed.get("summary"), "clauses": clauses, "sections": sections}
+
+
+def _clause_key(clause: Any) -> str:
+    if isinstance(clause, str):
+        return " ".join(clause.lower().split())
+    return json.dumps(clause, sort_keys=True)
+
+
+def diff_clauses(previous: List[Any], current: List[Any]) -> dict:
+    """Diff two clause lists, returning the added and removed clauses and the unchanged count."""
+    previous_keys = {_clause_key(c) for c in previous}
+    current_keys = {_clause_key(c) for c in current}
+    return {
+        "added": [c for c in current if _clause_key(c) not in previous_keys],
+        "removed": [c for c in previous if _clause_key(c) not in current_keys],
+        "unchanged": len(previous_keys & current_keys),
+    }
@@ -2,6 +2,7 @@ import smtplib
 import logging
 from email.mime.text import MIMEText
 from app.core.config import settings
+from app.core.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,7 @@ class EmailService:
             self.smtp_server != "smtp.example.com"  # Avoid placeholder values
         )
 
+    @traced("email.send")
     def send_email(self, to_email: str, subject: str, message: str):
         """Send email if properly configured, otherwise log the attempt."""
         logger.info(f"Email send attempt initiated for {to_email}")
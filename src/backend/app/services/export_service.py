@@ -0,0 +1,130 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterator, Optional, Tuple
+from bson import ObjectId
+from app.db.repositories.analysis_repository import AnalysisRepository
+from app.models.analysis import ContractAnalysis
+
+# Rows are buffered up to roughly this many characters before being flushed to the client.
+FLUSH_CHARS = 64 * 1024
+
+ANALYSIS_COLUMNS = [
+    "cursor", "id", "file_name", "status", "version", "parent_id", "model_used",
+    "created_at", "updated_at", "summary", "clause_count",
+]
+CLAUSE_COLUMNS = [
+    "cursor", "id", "file_name", "status", "version", "created_at", "clause_index", "clause",
+]
+
+
+def encode_cursor(analysis_id: str, clause_index: Optional[int] = None) -> str:
+    """Opaque resume token: resume after this analysis, or after this clause within it."""
+    raw = analysis_id if clause_index is None else f"{analysis_id}:{clause_index}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[ObjectId, Optional[int]]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        analysis_id, _, clause_index = raw.partition(":")
+        return ObjectId(analysis_id), int(clause_index) if clause_index else None
+    except Exception:
+        raise ValueError("Invalid export cursor")
+
+
+def _clause_text(clause) -> str:
+    return clause if isinstance(clause, str) else json.dumps(clause, default=str)
+
+
+class ExportService:
+    def __init__(self):
+        self.repository = AnalysisRepository()
+
+    async def _iter_rows(
+        self,
+        user_id: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        cursor: Optional[str],
+        per_clause: bool,
+    ) -> AsyncIterator[dict]:
+        from_id, skip_through = None, None
+        if cursor:
+            from_id, skip_through = decode_cursor(cursor)
+
+        analyses = self.repository.iter_for_user(
+            user_id, start=start, end=end, from_id=from_id, inclusive=skip_through is not None,
+        )
+        async for analysis in analyses:
+            resume_inside = skip_through is not None and analysis.id == from_id
+            if per_clause:
+                for row in self._clause_rows(analysis, skip_through if resume_inside else None):
+                    yield row
+            elif not resume_inside:
+                yield self._analysis_row(analysis)
+
+    def _analysis_row(self, analysis: ContractAnalysis) -> dict:
+        result = analysis.result or {}
+        return {
+            "cursor": encode_cursor(str(analysis.id)),
+            "id": str(analysis.id),
+            "file_name": analysis.file_name,
+            "status": analysis.status,
+            "version": analysis.version,
+            "parent_id": analysis.parent_id,
+            "model_used": analysis.model_used,
+            "created_at": analysis.created_at.isoformat(),
+            "updated_at": analysis.updated_at.isoformat(),
+            "summary": result.get("summary"),
+            "clause_count": len(result.get("clauses") or []),
+            "clauses": result.get("clauses") or [],
+        }
+
+    def _clause_rows(self, analysis: ContractAnalysis, skip_through: Optional[int]) -> Iterator[dict]:
+        base = {
+            "id": str(analysis.id),
+            "file_name": analysis.file_name,
+            "status": analysis.status,
+            "version": analysis.version,
+            "created_at": analysis.created_at.isoformat(),
+        }
+        clauses = (analysis.result or {}).get("clauses") or []
+        if not clauses and skip_through is None:
+            # Keep clause-less analyses visible in the export.
+            yield {"cursor": encode_cursor(str(analysis.id)), **base, "clause_index": None, "clause": None}
+        for index, clause in enumerate(clauses):
+            if skip_through is not None and index <= skip_through:
+                continue
+            yield {"cursor": encode_cursor(str(analysis.id), index), **base, "clause_index": index, "clause": clause}
+
+    async def iter_ndjson(self, user_id: str, start=None, end=None, cursor=None, per_clause=False) -> AsyncIterator[str]:
+        buffer = []
+        size = 0
+        async for row in self._iter_rows(user_id, start, end, cursor, per_clause):
+            line = json.dumps(row, default=str) + "\n"
+            buffer.append(line)
+            size += len(line)
+            if size >= FLUSH_CHARS:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+
+    async def iter_csv(self, user_id: str, start=None, end=None, cursor=None, per_clause=False) -> AsyncIterator[str]:
+        columns = CLAUSE_COLUMNS if per_clause else ANALYSIS_COLUMNS
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        async for row in self._iter_rows(user_id, start, end, cursor, per_clause):
+            if per_clause and row["clause"] is not None:
+                row["clause"] = _clause_text(row["clause"])
+            writer.writerow(row)
+            if output.tell() >= FLUSH_CHARS:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        if output.tell():
+            yield output.getvalue()
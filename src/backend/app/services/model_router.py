@@ -0,0 +1,154 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field
+import openai
+from app.core.config import settings
+from app.core.tracing import tracer
+from app.worker.extraction import DocumentTooLargeError
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English prose; good enough for routing.
+CHARS_PER_TOKEN = 4
+
+# Errors worth retrying on the fallback model: timeouts, connection drops and 5xx.
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class ModelRoute(BaseModel):
+    model: str
+    max_input_tokens: int
+    max_output_tokens: int = 2048
+    expected_latency_seconds: float = 30.0
+    cost_per_1k_tokens: float = 0.0
+    tiers: List[str] = Field(default_factory=lambda: ["free", "standard", "premium"])
+
+
+class RoutingDecision(BaseModel):
+    model: str
+    max_output_tokens: int
+    timeout_seconds: float
+    fallback_model: Optional[str] = None
+    fallback_max_output_tokens: int = 2048
+    estimated_tokens: int = 0
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a piece of text."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def max_document_chars() -> int:
+    """
+    Longest text worth extracting: no more than the largest route can accept,
+    and never more than EXTRACTION_MAX_CHARS.
+    """
+    largest = max((route["max_input_tokens"] for route in settings.LLM_ROUTES), default=0)
+    return min(settings.EXTRACTION_MAX_CHARS, largest * CHARS_PER_TOKEN)
+
+
+def estimate_cost(route: ModelRoute, token_count: int) -> float:
+    """Worst-case cost of a request: the prompt plus as many output tokens as the route allows."""
+    return (token_count + route.max_output_tokens) / 1000 * route.cost_per_1k_tokens
+
+
+class ModelRouter:
+    def __init__(self, routes: Optional[List[dict]] = None):
+        self.routes = [ModelRoute(**route) for route in (routes if routes is not None else settings.LLM_ROUTES)]
+        self.fallback_model = settings.LLM_FALLBACK_MODEL
+        self.default_timeout = settings.LLM_REQUEST_TIMEOUT_SECONDS
+
+    def select(
+        self,
+        token_count: int,
+        tier: str = "standard",
+        latency_budget_seconds: Optional[float] = None,
+        cost_budget_usd: Optional[float] = None,
+    ) -> RoutingDecision:
+        """Pick the first route that fits the document size, user tier and budgets."""
+        candidates = [
+            route for route in self.routes
+            if tier in route.tiers and token_count <= route.max_input_tokens
+        ]
+        if not candidates:
+            # Every model this tier may use is too small; calling one would only fail with a 400.
+            logger.warning(f"No route fits {token_count} tokens for tier '{tier}', rejecting document")
+            raise DocumentTooLargeError(
+                f"Document needs about {token_count} tokens, more than any model available to tier '{tier}' accepts"
+            )
+
+        within_budget = [
+            route for route in candidates
+            if (latency_budget_seconds is None or route.expected_latency_seconds <= latency_budget_seconds)
+            and (cost_budget_usd is None or estimate_cost(route, token_count) <= cost_budget_usd)
+        ]
+        timeout = self.default_timeout
+        if within_budget:
+            route = within_budget[0]
+            if latency_budget_seconds is not None:
+                timeout = min(timeout, latency_budget_seconds)
+        else:
+            # Nothing meets the budget; take the fastest model that can hold the document
+            # and give it its normal timeout rather than one it cannot possibly meet.
+            route = min(candidates, key=lambda r: r.expected_latency_seconds)
+            logger.warning(f"No route meets latency/cost budget for {token_count} tokens, using {route.model}")
+
+        # The fallback must obey the same tier and size limits as the primary, so it
+        # comes from the candidates: LLM_FALLBACK_MODEL if it qualifies, else the next one.
+        alternatives = [r for r in candidates if r.model != route.model]
+        fallback = next((r for r in alternatives if r.model == self.fallback_model), None)
+        if fallback is None and alternatives:
+            fallback = alternatives[0]
+
+        logger.info(
+            f"Routed {token_count} tokens (tier '{tier}') to model {route.model}, "
+            f"fallback: {fallback.model if fallback else None}"
+        )
+        return RoutingDecision(
+            model=route.model,
+            max_output_tokens=route.max_output_tokens,
+            timeout_seconds=timeout,
+            fallback_model=fallback.model if fallback else None,
+            fallback_max_output_tokens=fallback.max_output_tokens if fallback else route.max_output_tokens,
+            estimated_tokens=token_count,
+        )
+
+    def complete(self, client: openai.OpenAI, decision: RoutingDecision, messages: List[dict]) -> Tuple[object, str]:
+        """
+        Run a chat completion on the routed model, retrying once on the fallback
+        model for timeouts and server errors. Returns the response and the model used.
+        """
+        attempts = [(decision.model, decision.max_output_tokens)]
+        if decision.fallback_model:
+            attempts.append((decision.fallback_model, decision.fallback_max_output_tokens))
+
+        last_error = None
+        for model, max_tokens in attempts:
+            started = time.monotonic()
+            with tracer.start_as_current_span("llm.chat_completion") as span:
+                span.set_attribute("llm.model", model)
+                span.set_attribute("llm.max_tokens", max_tokens)
+                span.set_attribute("llm.estimated_input_tokens", decision.estimated_tokens)
+                try:
+                    logger.info(f"Calling OpenAI model {model} (max_tokens={max_tokens}, timeout={decision.timeout_seconds}s)")
+                    response = client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        timeout=decision.timeout_seconds,
+                    )
+                    logger.info(f"OpenAI model {model} responded in {time.monotonic() - started:.2f}s")
+                    return response, model
+                except RETRYABLE_ERRORS as e:
+                    logger.warning(f"OpenAI model {model} failed after {time.monotonic() - started:.2f}s: {type(e).__name__}: {str(e)}")
+                    span.record_exception(e)
+                    span.set_attribute("llm.retryable_error", type(e).__name__)
+                    last_error = e
+        raise last_error
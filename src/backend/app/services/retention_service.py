@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from app.core.config import settings
+from app.db.database import get_collection
+from app.db.redis_client import get_redis
+from app.models.analysis import AnalysisStatus
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "retention:metrics"
+ACTIVE_STATUSES = [AnalysisStatus.PENDING, AnalysisStatus.IN_PROGRESS]
+
+
+def document_expiry(status: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    When an analysis in this status should be removed by the TTL index, if ever.
+    Never before the sweep has had a chance to delete its source file, since the
+    record is how the sweep finds the file.
+    """
+    days = settings.RETENTION_ANALYSIS_DAYS.get(status)
+    if not settings.RETENTION_ENABLED or not days:
+        return None
+    keep_for = timedelta(days=days)
+    source_hours = settings.RETENTION_SOURCE_FILE_HOURS.get(status)
+    if source_hours is not None:
+        source_deadline = timedelta(hours=source_hours, seconds=settings.RETENTION_SWEEP_INTERVAL_SECONDS)
+        keep_for = max(keep_for, source_deadline)
+    return (now or datetime.utcnow()) + keep_for
+
+
+class RetentionService:
+    """
+    Deletes uploaded source files once their analysis has been in a terminal
+    status for the configured number of hours, then deletes any upload older
+    than the longest policy that no live analysis references. Deletes run in
+    batches with a pause between them so a large backlog does not saturate
+    disk or Mongo.
+    """
+
+    def __init__(self):
+        self.upload_directory = os.path.realpath(settings.UPLOAD_DIRECTORY)
+        self.batch_size = settings.RETENTION_SWEEP_BATCH_SIZE
+        self.max_batches = settings.RETENTION_SWEEP_MAX_BATCHES
+        self.max_deletes_per_second = settings.RETENTION_SWEEP_MAX_DELETES_PER_SECOND
+
+    def _delete_file(self, path: str) -> int:
+        """Delete a file inside the upload directory, returning the bytes reclaimed."""
+        real_path = os.path.realpath(path)
+        if os.path.commonpath([real_path, self.upload_directory]) != self.upload_directory:
+            logger.warning(f"Refusing to delete {path}: outside {self.upload_directory}")
+            return 0
+        try:
+            size = os.path.getsize(real_path)
+            os.remove(real_path)
+            return size
+        except FileNotFoundError:
+            return 0
+
+    async def _record_metrics(self, files_deleted: int, bytes_reclaimed: int) -> None:
+        try:
+            redis_client = get_redis()
+            await redis_client.hincrby(METRICS_KEY, "files_deleted", files_deleted)
+            await redis_client.hincrby(METRICS_KEY, "bytes_reclaimed", bytes_reclaimed)
+        except Exception as e:
+            logger.error(f"Failed to record retention metrics: {str(e)}")
+
+    def _old_uploads(self, max_age_seconds: float) -> List[str]:
+        """Paths of regular files in the upload directory last written more than max_age_seconds ago."""
+        cutoff = time.time() - max_age_seconds
+        try:
+            with os.scandir(self.upload_directory) as entries:
+                return [
+                    entry.path for entry in entries
+                    if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff
+                ]
+        except FileNotFoundError:
+            return []
+
+    async def _sweep_orphans(self, analyses, batches: int) -> Tuple[int, int]:
+        """
+        Delete uploads no analysis still needs: files whose analysis was never
+        created, files overwritten by a later upload of the same name, and files
+        whose analysis was removed by the TTL index first. Only files older than
+        the longest source-file policy are considered, so an upload whose
+        analysis is still being created is left alone.
+        """
+        if not settings.RETENTION_SOURCE_FILE_HOURS:
+            return 0, 0
+        max_age_seconds = max(settings.RETENTION_SOURCE_FILE_HOURS.values()) * 3600
+        paths = await asyncio.to_thread(self._old_uploads, max_age_seconds)
+
+        files_deleted = 0
+        bytes_reclaimed = 0
+        for start in range(0, len(paths), self.batch_size):
+            if batches >= self.max_batches:
+                break
+            batches += 1
+            batch = paths[start:start + self.batch_size]
+            # Analyses store the path as built at upload time, which may be relative.
+            stored_paths = {
+                path: [path, os.path.join(settings.UPLOAD_DIRECTORY, os.path.basename(path))]
+                for path in batch
+            }
+            referenced = set(await analyses.distinct("s3_path", {
+                "s3_path": {"$in": [p for candidates in stored_paths.values() for p in candidates]},
+                "source_deleted_at": None,
+            }))
+            for path, candidates in stored_paths.items():
+                if referenced.intersection(candidates):
+                    continue
+                reclaimed = await asyncio.to_thread(self._delete_file, path)
+                if reclaimed:
+                    files_deleted += 1
+                    bytes_reclaimed += reclaimed
+            await asyncio.sleep(len(batch) / self.max_deletes_per_second)
+
+        if files_deleted:
+            logger.info(f"Retention sweep deleted {files_deleted} orphaned uploads, reclaimed {bytes_reclaimed} bytes")
+        return files_deleted, bytes_reclaimed
+
+    async def sweep(self) -> dict:
+        if not settings.RETENTION_ENABLED:
+            return {"files_deleted": 0, "bytes_reclaimed": 0}
+
+        analyses = await get_collection("analyses")
+        now = datetime.utcnow()
+        files_deleted = 0
+        bytes_reclaimed = 0
+        batches = 0
+
+        for status, hours in settings.RETENTION_SOURCE_FILE_HOURS.items():
+            cutoff = now - timedelta(hours=hours)
+            while batches < self.max_batches:
+                batch = await analyses.find(
+                    {
+                        "status": status,
+                        "source_deleted_at": None,
+                        "$or": [
+                            {"status_changed_at": {"$lt": cutoff}},
+                            # Analyses finished before status_changed_at was recorded.
+                            {"status_changed_at": None, "updated_at": {"$lt": cutoff}},
+                        ],
+                    },
+                    {"_id": 1, "s3_path": 1},
+                ).limit(self.batch_size).to_list(length=self.batch_size)
+                if not batch:
+                    break
+                batches += 1
+
+                for document in batch:
+                    path = document.get("s3_path")
+                    # Uploads share a directory keyed by file name, so keep the file
+                    # while a newer analysis of the same name is still using it.
+                    in_use = await analyses.count_documents(
+                        {"s3_path": path, "status": {"$in": ACTIVE_STATUSES}}, limit=1
+                    )
+                    if path and not in_use:
+                        reclaimed = await asyncio.to_thread(self._delete_file, path)
+                        if reclaimed:
+                            files_deleted += 1
+                            bytes_reclaimed += reclaimed
+
+                await analyses.update_many(
+                    {"_id": {"$in": [document["_id"] for document in batch]}},
+                    {"$set": {"source_deleted_at": now}},
+                )
+                await asyncio.sleep(len(batch) / self.max_deletes_per_second)
+
+        orphans_deleted, orphan_bytes = await self._sweep_orphans(analyses, batches)
+        files_deleted += orphans_deleted
+        bytes_reclaimed += orphan_bytes
+
+        await self._record_metrics(files_deleted, bytes_reclaimed)
+        logger.info(f"Retention sweep deleted {files_deleted} files, reclaimed {bytes_reclaimed} bytes in {batches} batches")
+        return {"files_deleted": files_deleted, "bytes_reclaimed": bytes_reclaimed, "batches": batches}
@@ -0,0 +1,114 @@
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from app.db.database import get_collection
+from app.db.repositories.user_stats_repository import UserStatsRepository
+from app.models.analysis import AnalysisStatus
+from app.models.user_stats import UserStats
+from app.schemas.user import UserStats as UserStatsSchema
+
+logger = logging.getLogger(__name__)
+
+
+def month_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+
+class StatsService:
+    """
+    Maintains a per-user stats document with atomic $inc updates on every
+    analysis status transition, so dashboard reads are a single find_one.
+    Counter updates never raise; drift is repaired by `reconcile`.
+    """
+
+    def __init__(self):
+        self.repository = UserStatsRepository()
+
+    async def _increment(self, user_id: str, inc: dict) -> None:
+        try:
+            await self.repository.increment(user_id, inc)
+        except Exception as e:
+            logger.error(f"Failed to update stats for user {user_id}: {str(e)}")
+            logger.error(f"Stats error type: {type(e).__name__}")
+
+    async def record_created(self, user_id: str, created_at: datetime) -> None:
+        await self._increment(user_id, {
+            "total": 1,
+            f"by_status.{AnalysisStatus.PENDING}": 1,
+            f"by_month.{month_key(created_at)}": 1,
+        })
+
+    async def record_transition(
+        self,
+        user_id: str,
+        from_status: str,
+        to_status: str,
+        created_at: Optional[datetime] = None,
+        changed_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Move one analysis between status counters. For completions, pass the
+        analysis' created_at and the status_changed_at that was stored with it
+        so the live turnaround matches what `reconcile` later computes.
+        """
+        if from_status == to_status:
+            return
+        inc = {f"by_status.{from_status}": -1, f"by_status.{to_status}": 1}
+        if to_status == AnalysisStatus.COMPLETED and created_at is not None:
+            inc["turnaround_count"] = 1
+            inc["turnaround_seconds_total"] = ((changed_at or datetime.utcnow()) - created_at).total_seconds()
+        await self._increment(user_id, inc)
+
+    async def get_stats(self, user_id: str) -> UserStatsSchema:
+        stats = await self.repository.get_by_user_id(user_id)
+        if not stats:
+            return UserStatsSchema()
+        average = None
+        if stats.turnaround_count:
+            average = stats.turnaround_seconds_total / stats.turnaround_count
+        return UserStatsSchema(
+            total=stats.total,
+            by_status={status: count for status, count in stats.by_status.items() if count},
+            average_turnaround_seconds=average,
+            contracts_this_month=stats.by_month.get(month_key(datetime.utcnow()), 0),
+        )
+
+    async def reconcile(self, user_id: Optional[str] = None) -> int:
+        """Rebuild stats documents from the analyses collection. Returns the number of users rebuilt."""
+        analyses = await get_collection("analyses")
+        match = {"user_id": user_id} if user_id else {}
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {
+                    "user_id": "$user_id",
+                    "status": "$status",
+                    "month": {"$dateToString": {"format": "%Y-%m", "date": "$created_at"}},
+                },
+                "count": {"$sum": 1},
+                "turnaround_ms": {"$sum": {"$cond": [
+                    {"$eq": ["$status", AnalysisStatus.COMPLETED]},
+                    # Analyses completed before status_changed_at existed fall back to updated_at.
+                    {"$subtract": [{"$ifNull": ["$status_changed_at", "$updated_at"]}, "$created_at"]},
+                    0,
+                ]}},
+            }},
+        ]
+
+        rebuilt: Dict[str, UserStats] = {}
+        async for row in analyses.aggregate(pipeline):
+            key = row["_id"]
+            stats = rebuilt.setdefault(key["user_id"], UserStats(user_id=key["user_id"]))
+            stats.total += row["count"]
+            stats.by_status[key["status"]] = stats.by_status.get(key["status"], 0) + row["count"]
+            stats.by_month[key["month"]] = stats.by_month.get(key["month"], 0) + row["count"]
+            if key["status"] == AnalysisStatus.COMPLETED:
+                stats.turnaround_count += row["count"]
+                stats.turnaround_seconds_total += row["turnaround_ms"] / 1000
+
+        if user_id and user_id not in rebuilt:
+            rebuilt[user_id] = UserStats(user_id=user_id)
+        for stats in rebuilt.values():
+            await self.repository.replace(stats)
+        logger.info(f"Reconciled stats for {len(rebuilt)} users")
+        return len(rebuilt)
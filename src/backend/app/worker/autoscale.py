@@ -0,0 +1,85 @@
+import logging
+import math
+import time
+from celery.worker.autoscale import Autoscaler
+from app.core.config import settings
+from app.db.redis_client import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+# Celery's default queue is a Redis list with this name on the broker.
+ANALYSIS_QUEUE = "celery"
+LLM_LATENCY_KEY = "worker:llm_latency_ewma"
+
+# Atomically fold a new sample into the exponentially weighted moving average.
+EWMA_SCRIPT = """
+local alpha = tonumber(ARGV[1])
+local sample = tonumber(ARGV[2])
+local current = tonumber(redis.call('GET', KEYS[1]))
+if current == nil then
+    current = sample
+else
+    current = alpha * sample + (1 - alpha) * current
+end
+redis.call('SET', KEYS[1], tostring(current))
+return tostring(current)
+"""
+
+
+def record_llm_latency(seconds: float) -> None:
+    """Record an observed LLM call latency for the autoscaler."""
+    try:
+        get_sync_redis().eval(EWMA_SCRIPT, 1, LLM_LATENCY_KEY, settings.CELERY_AUTOSCALE_LATENCY_EWMA_ALPHA, seconds)
+    except Exception as e:
+        logger.error(f"Failed to record LLM latency: {str(e)}")
+
+
+def get_llm_latency() -> float:
+    value = get_sync_redis().get(LLM_LATENCY_KEY)
+    return float(value) if value else settings.CELERY_AUTOSCALE_DEFAULT_LATENCY_SECONDS
+
+
+def get_queue_depth() -> int:
+    return get_sync_redis(settings.celery_broker_url).llen(ANALYSIS_QUEUE)
+
+
+def desired_processes(queue_depth: int, latency_seconds: float, local_reserved: int = 0) -> int:
+    """
+    Processes this node needs to drain its share of the queue within the target
+    drain time, given that each process finishes one analysis per LLM latency.
+    """
+    nodes = max(1, settings.CELERY_AUTOSCALE_EXPECTED_NODES)
+    drain_seconds = max(1.0, settings.CELERY_AUTOSCALE_TARGET_DRAIN_SECONDS)
+    needed = math.ceil(queue_depth * latency_seconds / drain_seconds / nodes)
+    return max(needed, local_reserved)
+
+
+class QueueDepthAutoscaler(Autoscaler):
+    """
+    Scales pool processes on broker queue depth and observed LLM latency
+    instead of the locally reserved task count. Analyses spend most of their
+    time waiting on the LLM, so CPU load is a poor signal of demand.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_poll = 0.0
+        self._desired = 0
+
+    @property
+    def qty(self):
+        local_reserved = super().qty
+        now = time.monotonic()
+        if now - self._last_poll >= settings.CELERY_AUTOSCALE_POLL_SECONDS:
+            self._last_poll = now
+            try:
+                queue_depth = get_queue_depth()
+                latency = get_llm_latency()
+                desired = desired_processes(queue_depth, latency, local_reserved)
+                if desired != self._desired:
+                    logger.info(f"Autoscaler target {desired} processes (queue depth {queue_depth}, LLM latency {latency:.1f}s)")
+                self._desired = desired
+            except Exception as e:
+                logger.error(f"Autoscaler failed to read queue metrics: {str(e)}")
+                self._desired = local_reserved
+        return max(self._desired, local_reserved)
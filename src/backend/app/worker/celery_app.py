@@ -1,12 +1,46 @@
-from celery import Celery
+from celery import Celery, signals
+from app.core.config import settings
+from app.core.tracing import add_trace_filter, instrument_celery, setup_tracing
 
 celery_app = Celery(
     "worker",
-    broker="redis://localhost:6379/0",
-    backend="redis://localhost:6379/0",
+    broker=settings.celery_broker_url,
+    backend=settings.celery_result_backend,
     include=["app.worker.tasks"]
 )
 
 celery_app.conf.update(
     task_track_started=True,
-)
\ No newline at end of file
+    # Analyses are I/O-bound on the LLM, so keep prefetch low to spread work
+    # across processes and recycle children to bound PDF/DOCX parser memory.
+    worker_pool=settings.CELERY_WORKER_POOL,
+    worker_concurrency=settings.CELERY_WORKER_CONCURRENCY,
+    worker_prefetch_multiplier=settings.CELERY_WORKER_PREFETCH_MULTIPLIER,
+    worker_max_tasks_per_child=settings.CELERY_WORKER_MAX_TASKS_PER_CHILD,
+    worker_max_memory_per_child=settings.CELERY_WORKER_MAX_MEMORY_PER_CHILD_KB,
+    worker_autoscaler="app.worker.autoscale:QueueDepthAutoscaler",
+    worker_log_format="[%(asctime)s: %(levelname)s/%(processName)s] trace_id=%(trace_id)s %(message)s",
+    worker_task_log_format="[%(asctime)s: %(levelname)s/%(processName)s] %(task_name)s[%(task_id)s] trace_id=%(trace_id)s %(message)s",
+    beat_schedule={
+        "reconcile-user-stats": {
+            "task": "app.worker.tasks.reconcile_user_stats",
+            "schedule": settings.STATS_RECONCILE_INTERVAL_SECONDS,
+        },
+        "sweep-retention": {
+            "task": "app.worker.tasks.sweep_retention",
+            "schedule": settings.RETENTION_SWEEP_INTERVAL_SECONDS,
+        },
+    },
+)
+
+instrument_celery()
+
+@signals.worker_init.connect
+@signals.worker_process_init.connect
+def init_worker_tracing(**kwargs):
+    setup_tracing("worker")
+
+@signals.after_setup_logger.connect
+@signals.after_setup_task_logger.connect
+def add_trace_ids_to_logs(logger=None, **kwargs):
+    add_trace_filter(logger)
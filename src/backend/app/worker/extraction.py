@@ -0,0 +1,149 @@
+import logging
+import tempfile
+import zipfile
+from typing import Iterator, Optional
+from xml.etree import ElementTree
+import pypdf
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# DOCX has no layout pages; yield a "page" at each page break, or after this
+# many characters for documents that have no page breaks at all.
+DOCX_PAGE_CHARS = 20000
+
+
+class DocumentTooLargeError(ValueError):
+    """Raised when a document exceeds the configured page or character limits, or every model's context."""
+
+
+def _iter_pdf_pages(file_path: str, max_pages: Optional[int]) -> Iterator[str]:
+    with open(file_path, "rb") as f:
+        pdf_reader = pypdf.PdfReader(f)
+        page_count = len(pdf_reader.pages)
+        if max_pages and page_count > max_pages:
+            raise DocumentTooLargeError(f"Document has {page_count} pages, the limit is {max_pages}")
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""
+
+
+def _iter_docx_pages(file_path: str) -> Iterator[str]:
+    """Stream paragraphs out of word/document.xml without building the whole DOM."""
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+        page, page_chars, depth, body = [], 0, 0, None
+        for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if elem.tag == f"{WORD_NS}body":
+                    body = elem
+                continue
+
+            depth -= 1
+            if elem.tag == f"{WORD_NS}p":
+                parts, page_break = [], False
+                for node in elem.iter():
+                    if node.tag == f"{WORD_NS}t":
+                        parts.append(node.text or "")
+                    elif node.tag == f"{WORD_NS}tab":
+                        parts.append("\t")
+                    elif node.tag == f"{WORD_NS}lastRenderedPageBreak" or (
+                        node.tag == f"{WORD_NS}br" and node.get(f"{WORD_NS}type") == "page"
+                    ):
+                        page_break = True
+                text = "".join(parts)
+                page.append(text)
+                page_chars += len(text)
+                if page_break or page_chars >= DOCX_PAGE_CHARS:
+                    yield "\n".join(page)
+                    page, page_chars = [], 0
+            # Drop finished top-level blocks (document > body > block) to keep memory flat.
+            if depth == 2 and body is not None:
+                body.clear()
+        if page:
+            yield "\n".join(page)
+
+
+def iter_contract_pages(file_path: str, max_pages: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of a .docx or .pdf file one page at a time."""
+    if file_path.endswith(".docx"):
+        for number, page in enumerate(_iter_docx_pages(file_path), start=1):
+            if max_pages and number > max_pages:
+                raise DocumentTooLargeError(f"Document has more than {max_pages} pages")
+            yield page
+    elif file_path.endswith(".pdf"):
+        yield from _iter_pdf_pages(file_path, max_pages)
+    else:
+        raise ValueError("Unsupported file type")
+
+
+class ExtractedText:
+    """
+    Extracted document text held in memory as UTF-8 up to a byte budget and
+    spilled to a temporary file beyond it.
+    """
+
+    def __init__(self, memory_budget_bytes: int):
+        self._file = tempfile.SpooledTemporaryFile(max_size=memory_budget_bytes, mode="w+b")
+        self.page_count = 0
+        self.char_count = 0
+
+    @property
+    def spilled(self) -> bool:
+        return self._file._rolled
+
+    def append_page(self, text: str) -> None:
+        if self.page_count:
+            text = "\n" + text
+        self._file.write(text.encode("utf-8"))
+        self.page_count += 1
+        self.char_count += len(text)
+
+    def read(self) -> str:
+        self._file.seek(0)
+        return self._file.read().decode("utf-8")
+
+    def iter_lines(self) -> Iterator[str]:
+        self._file.seek(0)
+        for line in self._file:
+            yield line.decode("utf-8").rstrip("\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def extract_contract_text(
+    file_path: str,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    memory_budget_bytes: Optional[int] = None,
+) -> ExtractedText:
+    """
+    Extract a document page by page into an ExtractedText, failing fast with
+    DocumentTooLargeError once the page or character limit is exceeded.
+    """
+    max_pages = settings.EXTRACTION_MAX_PAGES if max_pages is None else max_pages
+    max_chars = settings.EXTRACTION_MAX_CHARS if max_chars is None else max_chars
+    memory_budget_bytes = settings.EXTRACTION_MEMORY_BUDGET_BYTES if memory_budget_bytes is None else memory_budget_bytes
+
+    extracted = ExtractedText(memory_budget_bytes)
+    try:
+        for page in iter_contract_pages(file_path, max_pages=max_pages):
+            extracted.append_page(page)
+            if max_chars and extracted.char_count > max_chars:
+                raise DocumentTooLargeError(f"Document has more than {max_chars} characters")
+    except Exception:
+        extracted.close()
+        raise
+
+    logger.info(
+        f"Extracted {extracted.page_count} pages ({extracted.char_count} chars) from {file_path}"
+        f"{', spilled to disk' if extracted.spilled else ''}"
+    )
+    return extracted
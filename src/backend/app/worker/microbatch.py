@@ -0,0 +1,151 @@
+import json
+import logging
+import time
+import uuid
+from typing import List, Optional, Tuple
+import openai
+from app.core.config import settings
+from app.db.redis_client import get_sync_redis
+from app.models.analysis import ContractAnalysis
+from app.services.model_router import ModelRouter, estimate_tokens
+from app.worker.autoscale import record_llm_latency
+
+logger = logging.getLogger(__name__)
+
+# Batches are formed per user tier so a batch only uses routes every member may use.
+QUEUE_KEY = "microbatch:queue:{tier}"
+LEADER_KEY = "microbatch:leader:{tier}"
+RESULT_KEY = "microbatch:result:{analysis_id}"
+RESULT_TTL_SECONDS = 300
+
+# Delete the leader lock only if we still own it.
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def batch_size(tier: str) -> int:
+    """
+    How many documents one request can carry for a tier: enough that the
+    smallest output allowance of any route the tier may use still fits a full
+    answer for each document, and no more than LLM_MICROBATCH_MAX_DOCUMENTS.
+    """
+    allowances = [route.max_output_tokens for route in ModelRouter().routes if tier in route.tiers]
+    if not allowances:
+        return 0
+    return min(settings.LLM_MICROBATCH_MAX_DOCUMENTS, min(allowances) // settings.LLM_MICROBATCH_OUTPUT_TOKENS_PER_DOCUMENT)
+
+
+def is_batchable(analysis: ContractAnalysis, prompt_tokens: int, tier: str) -> bool:
+    """Small, budget-free analyses can share an LLM request with other documents."""
+    return (
+        settings.LLM_MICROBATCH_ENABLED
+        and prompt_tokens <= settings.LLM_MICROBATCH_MAX_DOCUMENT_TOKENS
+        and analysis.latency_budget_seconds is None
+        and analysis.cost_budget_usd is None
+        and batch_size(tier) > 1
+    )
+
+
+def build_batch_prompt(items: List[dict]) -> str:
+    documents = []
+    for index, item in enumerate(items, start=1):
+        body = "\n\n".join(f"[Section {number}]\n{text}" for number, text in item["sections"])
+        documents.append(f"=== BEGIN DOCUMENT doc_{index} ===\n{body}\n=== END DOCUMENT doc_{index} ===")
+    keys = ", ".join(f'"doc_{index}"' for index in range(1, len(items) + 1))
+    joined = "\n\n".join(documents)
+    return f"""
+Analyze each of the following {len(items)} independent contracts and return your analysis in JSON format.
+Each contract is delimited by BEGIN/END DOCUMENT markers and split into numbered sections marked [Section N].
+Return one JSON object with exactly these keys: {keys}.
+Each value is an object with two keys: "summary" and "sections".
+- "summary": A brief summary of that contract.
+- "sections": An object mapping each section number (as a string) to a list of key clauses found in that section.
+
+{joined}
+"""
+
+
+def _process_batch(items: List[dict], tier: str) -> None:
+    """Run one packed LLM request and publish each document's result for its waiting task."""
+    from app.worker.tasks import extract_json_from_markdown
+
+    redis_client = get_sync_redis()
+    outcomes = {item["id"]: {"fallback": True} for item in items}
+    try:
+        prompt = build_batch_prompt(items)
+        router = ModelRouter()
+        decision = router.select(token_count=estimate_tokens(prompt), tier=tier)
+        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        llm_started = time.monotonic()
+        response, model_used = router.complete(
+            client,
+            decision,
+            messages=[
+                {"role": "system", "content": "You are a helpful legal assistant that provides analysis in JSON format."},
+                {"role": "user", "content": prompt},
+            ],
+        )
+        record_llm_latency(time.monotonic() - llm_started)
+
+        parsed = json.loads(extract_json_from_markdown(response.choices[0].message.content or ""))
+        for index, item in enumerate(items, start=1):
+            document = parsed.get(f"doc_{index}") if isinstance(parsed, dict) else None
+            if isinstance(document, dict) and isinstance(document.get("sections"), dict):
+                outcomes[item["id"]] = {"result": document, "model_used": model_used}
+        logger.info(f"Micro-batch of {len(items)} analyses parsed, {sum('result' in o for o in outcomes.values())} succeeded")
+    except Exception as e:
+        logger.error(f"Micro-batch of {len(items)} analyses failed, falling back to individual calls: {str(e)}")
+        logger.error(f"Micro-batch error type: {type(e).__name__}")
+    finally:
+        for analysis_id, outcome in outcomes.items():
+            key = RESULT_KEY.format(analysis_id=analysis_id)
+            redis_client.rpush(key, json.dumps(outcome))
+            redis_client.expire(key, RESULT_TTL_SECONDS)
+
+
+def analyze_in_batch(analysis_id: str, sections: List[Tuple[int, str]], tier: str) -> Optional[Tuple[dict, str]]:
+    """
+    Queue a small analysis for a packed LLM request and wait for its share of
+    the response. Whichever waiting task takes its tier's leader lock collects
+    that tier's queue for one window and makes the call. Returns (parsed result, model
+    used), or None if the caller should fall back to an individual request.
+    """
+    redis_client = get_sync_redis()
+    window = settings.LLM_MICROBATCH_WINDOW_SECONDS
+    lock_ms = int((window + settings.LLM_REQUEST_TIMEOUT_SECONDS * 2) * 1000)
+    payload = json.dumps({"id": analysis_id, "sections": sections})
+    result_key = RESULT_KEY.format(analysis_id=analysis_id)
+    queue_key = QUEUE_KEY.format(tier=tier)
+    leader_key = LEADER_KEY.format(tier=tier)
+
+    try:
+        redis_client.rpush(queue_key, payload)
+        deadline = time.monotonic() + lock_ms / 1000 + window
+        while time.monotonic() < deadline:
+            token = str(uuid.uuid4())
+            if redis_client.set(leader_key, token, nx=True, px=lock_ms):
+                try:
+                    time.sleep(window)
+                    raw_items = redis_client.lpop(queue_key, batch_size(tier)) or []
+                    if raw_items:
+                        _process_batch([json.loads(raw) for raw in raw_items], tier)
+                finally:
+                    redis_client.eval(RELEASE_SCRIPT, 1, leader_key, token)
+
+            popped = redis_client.blpop(result_key, timeout=1)
+            if popped:
+                outcome = json.loads(popped[1])
+                if "result" in outcome:
+                    return outcome["result"], outcome["model_used"]
+                return None
+
+        # Nobody picked the document up in time; withdraw it and go it alone.
+        redis_client.lrem(queue_key, 1, payload)
+        logger.warning(f"Micro-batch timed out for analysis {analysis_id}")
+    except Exception as e:
+        logger.error(f"Micro-batching unavailable for analysis {analysis_id}: {str(e)}")
+    return None
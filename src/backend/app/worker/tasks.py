@@ -1,13 +1,30 @@
 import asyncio
 import logging
 import os
+import json
+import time
+from datetime import datetime
+from typing import Tuple
 from app.worker.celery_app import celery_app
 from app.models.analysis import AnalysisStatus
 from app.schemas.analysis import AnalysisUpdate
 from app.core.config import settings
+from app.core.tracing import tracer
+from app.services.model_router import ModelRouter, estimate_tokens, max_document_chars
+from app.services.admission_service import release_inflight
+from app.services.retention_service import document_expiry
+from app.services.contract_sections import (
+    assemble_result,
+    build_analysis_prompt,
+    diff_clauses,
+    reusable_sections,
+    section_hash,
+    split_sections,
+)
+from app.worker.autoscale import record_llm_latency
+from app.worker.microbatch import analyze_in_batch, is_batchable
+from app.worker.extraction import DocumentTooLargeError, extract_contract_text
 import openai
-import docx
-import pypdf
 from bson import ObjectId
 
 
@@ -50,17 +67,62 @@ def extract_json_from_markdown(content: str) -> str:
     # Return as-is if not wrapped
     return content
 
-def read_contract_content(file_path: str) -> str:
-    """Reads content from .docx or .pdf file."""
-    if file_path.endswith(".docx"):
-        doc = docx.Document(file_path)
-        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
-    elif file_path.endswith(".pdf"):
-        with open(file_path, "rb") as f:
-            pdf_reader = pypdf.PdfReader(f)
-            return "\n".join([page.extract_text() for page in pdf_reader.pages])
-    else:
-        raise ValueError("Unsupported file type")
+def parse_llm_response(response, analysis_id: str) -> Tuple[dict, bool]:
+    """
+    Parse the JSON analysis out of an OpenAI chat completion.
+    Returns the result and whether it was parsed from the model's output.
+    """
+    parsed = False
+    try:
+        logger.info(f"Checking OpenAI response structure for analysis {analysis_id}")
+        logger.info(f"Response type: {type(response)}")
+        logger.info(f"Response has choices attr: {hasattr(response, 'choices')}")
+        
+        if hasattr(response, 'choices'):
+            logger.info(f"Choices length: {len(response.choices)}")
+            if len(response.choices) > 0:
+                logger.info(f"First choice type: {type(response.choices[0])}")
+                logger.info(f"First choice has message attr: {hasattr(response.choices[0], 'message')}")
+                
+                if hasattr(response.choices[0], 'message'):
+                    logger.info(f"Message type: {type(response.choices[0].message)}")
+                    logger.info(f"Message has content attr: {hasattr(response.choices[0].message, 'content')}")
+                    
+                    # This is where the error might be occurring
+                    logger.info(f"Attempting to access message content for analysis {analysis_id}")
+                    raw_content = response.choices[0].message.content
+                    logger.info(f"Successfully accessed content. Type: {type(raw_content)}, Length: {len(raw_content) if raw_content else 'None'}")
+                    
+                    if raw_content:
+                        logger.info(f"Raw content preview: {raw_content[:200]}...")
+                        
+                        # Extract JSON from potential markdown wrapper
+                        cleaned_content = extract_json_from_markdown(raw_content)
+                        logger.info(f"Cleaned content preview: {cleaned_content[:200]}...")
+                        
+                        result = json.loads(cleaned_content)
+                        parsed = True
+                        logger.info(f"JSON parsing successful for analysis {analysis_id}")
+                    else:
+                        logger.error(f"OpenAI response content is None or empty for analysis {analysis_id}")
+                        result = {"summary": "Empty response from AI.", "clauses": []}
+                else:
+                    logger.error(f"OpenAI response choice has no message attribute for analysis {analysis_id}")
+                    result = {"summary": "Invalid response structure from AI.", "clauses": []}
+            else:
+                logger.error(f"OpenAI response has no choices for analysis {analysis_id}")
+                result = {"summary": "No choices in AI response.", "clauses": []}
+        else:
+            logger.error(f"OpenAI response has no choices attribute for analysis {analysis_id}")
+            result = {"summary": "Invalid response format from AI.", "clauses": []}
+            
+    except Exception as parse_error:
+        logger.error(f"Exception during OpenAI response processing for analysis {analysis_id}: {str(parse_error)}")
+        logger.error(f"Exception type: {type(parse_error).__name__}")
+        logger.error(f"Exception details: {repr(parse_error)}")
+        result = {"summary": "Failed to process AI response.", "clauses": []}
+
+    return result, parsed
 
 @celery_app.task(bind=True)
 def analyze_contract(self, analysis_id: str, user_id: str):
@@ -71,14 +133,19 @@ def analyze_contract(self, analysis_id: str, user_id: str):
     from app.services.email_service import EmailService
     from app.db.repositories.user_repository import UserRepository
     from app.db.repositories.analysis_repository import AnalysisRepository
+    from app.services.stats_service import StatsService
+    from app.services.clause_index_service import ClauseIndexService
 
     async def main():
         logger.info(f"Starting analysis for analysis_id: {analysis_id}")
         analysis_repo = AnalysisRepository()
         user_repo = UserRepository()
         email_service = EmailService()
+        stats_service = StatsService()
+        clause_index = ClauseIndexService()
         
         analysis_obj_id = ObjectId(analysis_id)
+        current_status = None
 
         try:
             # 1. Fetch the ContractAnalysis record
@@ -88,99 +155,130 @@ def analyze_contract(self, analysis_id: str, user_id: str):
                 return
 
             # 2. Update status to "processing"
-            await analysis_repo.update(analysis_obj_id, AnalysisUpdate(status=AnalysisStatus.IN_PROGRESS))
+            current_status = analysis.status
+            await analysis_repo.update(analysis_obj_id, AnalysisUpdate(
+                status=AnalysisStatus.IN_PROGRESS,
+                status_changed_at=datetime.utcnow(),
+            ))
+            await stats_service.record_transition(user_id, current_status, AnalysisStatus.IN_PROGRESS)
+            current_status = AnalysisStatus.IN_PROGRESS
 
-            # 3. Read contract content
+            # 3. Read contract content page by page, rejecting it as soon as it grows
+            #    past what the largest model can accept, and split it into sections
             file_path = analysis.s3_path
-            contract_text = read_contract_content(file_path)
-
-            # 4. Construct prompt for LLM
-            prompt = f"""
-            Analyze the following contract and return your analysis in JSON format.
-            The JSON object should have two keys: "summary" and "clauses".
-            - "summary": A brief summary of the contract.
-            - "clauses": A list of key clauses found in the contract.
-
-            Contract Text:
-            {contract_text}
-            """
-
-            # 5. Call OpenAI API
-            # Use OpenAI Python SDK v1+ interface
-            client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful legal assistant that provides analysis in JSON format."},
-                    {"role": "user", "content": prompt},
-                ],
-            )
-
-            # 6. Parse LLM response
-            import json
-            logger.info(f"OpenAI API call completed successfully for analysis {analysis_id}")
-            
-            try:
-                logger.info(f"Checking OpenAI response structure for analysis {analysis_id}")
-                logger.info(f"Response type: {type(response)}")
-                logger.info(f"Response has choices attr: {hasattr(response, 'choices')}")
-                
-                if hasattr(response, 'choices'):
-                    logger.info(f"Choices length: {len(response.choices)}")
-                    if len(response.choices) > 0:
-                        logger.info(f"First choice type: {type(response.choices[0])}")
-                        logger.info(f"First choice has message attr: {hasattr(response.choices[0], 'message')}")
-                        
-                        if hasattr(response.choices[0], 'message'):
-                            logger.info(f"Message type: {type(response.choices[0].message)}")
-                            logger.info(f"Message has content attr: {hasattr(response.choices[0].message, 'content')}")
-                            
-                            # This is where the error might be occurring
-                            logger.info(f"Attempting to access message content for analysis {analysis_id}")
-                            raw_content = response.choices[0].message.content
-                            logger.info(f"Successfully accessed content. Type: {type(raw_content)}, Length: {len(raw_content) if raw_content else 'None'}")
-                            
-                            if raw_content:
-                                logger.info(f"Raw content preview: {raw_content[:200]}...")
-                                
-                                # Extract JSON from potential markdown wrapper
-                                cleaned_content = extract_json_from_markdown(raw_content)
-                                logger.info(f"Cleaned content preview: {cleaned_content[:200]}...")
-                                
-                                result = json.loads(cleaned_content)
-                                logger.info(f"JSON parsing successful for analysis {analysis_id}")
-                            else:
-                                logger.error(f"OpenAI response content is None or empty for analysis {analysis_id}")
-                                result = {"summary": "Empty response from AI.", "clauses": []}
-                        else:
-                            logger.error(f"OpenAI response choice has no message attribute for analysis {analysis_id}")
-                            result = {"summary": "Invalid response structure from AI.", "clauses": []}
-                    else:
-                        logger.error(f"OpenAI response has no choices for analysis {analysis_id}")
-                        result = {"summary": "No choices in AI response.", "clauses": []}
+            with tracer.start_as_current_span("contract.extract") as span:
+                with extract_contract_text(file_path, max_chars=max_document_chars()) as extracted:
+                    sections = split_sections(extracted.iter_lines())
+                    span.set_attribute("contract.pages", extracted.page_count)
+                    span.set_attribute("contract.chars", extracted.char_count)
+                    span.set_attribute("contract.spilled", extracted.spilled)
+                span.set_attribute("contract.sections", len(sections))
+
+            # 4. Hash sections and reuse unchanged ones from the parent version
+            hashes = [section_hash(section) for section in sections]
+            parent = None
+            previous = {}
+            if analysis.parent_id:
+                parent = await analysis_repo.get(analysis.parent_id)
+                if parent and parent.status == AnalysisStatus.COMPLETED:
+                    previous = reusable_sections(parent.result)
                 else:
-                    logger.error(f"OpenAI response has no choices attribute for analysis {analysis_id}")
-                    result = {"summary": "Invalid response format from AI.", "clauses": []}
-                    
-            except Exception as parse_error:
-                logger.error(f"Exception during OpenAI response processing for analysis {analysis_id}: {str(parse_error)}")
-                logger.error(f"Exception type: {type(parse_error).__name__}")
-                logger.error(f"Exception details: {repr(parse_error)}")
-                result = {"summary": "Failed to process AI response.", "clauses": []}
+                    logger.warning(f"Parent analysis {analysis.parent_id} not completed, analyzing {analysis_id} in full")
+            reused = {number: previous[h] for number, h in enumerate(hashes, start=1) if h in previous}
+            analyzed = [number for number in range(1, len(sections) + 1) if number not in reused]
+            logger.info(f"Analysis {analysis_id}: {len(sections)} sections, {len(analyzed)} to analyze, {len(reused)} reused")
+
+            if analyzed or not reused:
+                # 5. Construct prompt for LLM from the changed sections only
+                prompt = build_analysis_prompt(
+                    [(number, sections[number - 1]) for number in analyzed],
+                    previous_summary=(parent.result or {}).get("summary") if reused else None,
+                )
+
+                # 6. Pack small documents into a shared request when micro-batching is on
+                user = await user_repo.get_by_id(user_id)
+                tier = user.tier if user else "standard"
+                batched = None
+                if not reused and is_batchable(analysis, estimate_tokens(prompt), tier):
+                    batched = analyze_in_batch(analysis_id, [(number, sections[number - 1]) for number in analyzed], tier)
 
+                if batched:
+                    batch_result, model_used = batched
+                    result = assemble_result(batch_result, hashes, analyzed, reused)
+                else:
+                    # 7. Route to a model by document size, user tier and budgets
+                    router = ModelRouter()
+                    decision = router.select(
+                        token_count=estimate_tokens(prompt),
+                        tier=tier,
+                        latency_budget_seconds=analysis.latency_budget_seconds,
+                        cost_budget_usd=analysis.cost_budget_usd,
+                    )
+
+                    # 8. Call OpenAI API, falling back to the secondary model on timeouts/5xx
+                    # Use OpenAI Python SDK v1+ interface
+                    client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+                    llm_started = time.monotonic()
+                    response, model_used = router.complete(
+                        client,
+                        decision,
+                        messages=[
+                            {"role": "system", "content": "You are a helpful legal assistant that provides analysis in JSON format."},
+                            {"role": "user", "content": prompt},
+                        ],
+                    )
+                    record_llm_latency(time.monotonic() - llm_started)
+
+                    # 9. Parse LLM response
+                    logger.info(f"OpenAI API call completed successfully for analysis {analysis_id}")
+                    result, parsed = parse_llm_response(response, analysis_id)
+                    if parsed and isinstance(result, dict):
+                        result = assemble_result(result, hashes, analyzed, reused)
+            else:
+                logger.info(f"No changed sections for analysis {analysis_id}, reusing parent {analysis.parent_id}")
+                model_used = parent.model_used
+                result = assemble_result({"summary": (parent.result or {}).get("summary"), "sections": {}}, hashes, [], reused)
+
+            if parent and isinstance(result, dict):
+                result["reused_sections"] = len(reused)
+                result["analyzed_sections"] = len(analyzed)
+                result["clause_diff"] = diff_clauses((parent.result or {}).get("clauses") or [], result.get("clauses") or [])
 
-            # 7. (Stretch Goal) Generate redlined docx (not implemented)
+            # 10. (Stretch Goal) Generate redlined docx (not implemented)
 
-            # 8. Update analysis record with results
+            # 11. Update analysis record with results
             logger.info(f"Attempting to update analysis record in database for analysis {analysis_id}")
             try:
-                await analysis_repo.update(analysis_obj_id, AnalysisUpdate(status=AnalysisStatus.COMPLETED, result=result))
+                completed_at = datetime.utcnow()
+                expires_at = document_expiry(AnalysisStatus.COMPLETED, now=completed_at)
+                await analysis_repo.update(analysis_obj_id, AnalysisUpdate(
+                    status=AnalysisStatus.COMPLETED,
+                    result=result,
+                    model_used=model_used,
+                    expires_at=expires_at,
+                    status_changed_at=completed_at,
+                ))
+                await stats_service.record_transition(
+                    user_id,
+                    current_status,
+                    AnalysisStatus.COMPLETED,
+                    created_at=analysis.created_at,
+                    changed_at=completed_at,
+                )
+                current_status = AnalysisStatus.COMPLETED
                 logger.info(f"Successfully updated analysis record for analysis {analysis_id}")
             except Exception as db_error:
                 logger.error(f"Database update failed for analysis {analysis_id}: {str(db_error)}")
                 logger.error(f"Database error type: {type(db_error).__name__}")
                 raise  # Re-raise to trigger the outer exception handler
 
+            # Index clauses for cross-contract search - failure should not affect analysis completion
+            try:
+                await clause_index.index_analysis(analysis, result, expires_at=expires_at)
+            except Exception as index_error:
+                logger.error(f"Clause indexing failed for analysis {analysis_id}: {str(index_error)}")
+                logger.error(f"Clause index error type: {type(index_error).__name__}")
+
             # Send email notification - separate from analysis completion
             logger.info(f"Starting email notification process for analysis {analysis_id}")
             try:
@@ -216,9 +314,17 @@ def analyze_contract(self, analysis_id: str, user_id: str):
             logger.error(f"Exception details: {repr(e)}")
             
             try:
-                logger.info(f"Attempting to update analysis status to FAILED for analysis {analysis_id}")
-                await analysis_repo.update(analysis_obj_id, AnalysisUpdate(status=AnalysisStatus.FAILED))
-                logger.info(f"Successfully updated analysis status to FAILED for analysis {analysis_id}")
+                if isinstance(e, DocumentTooLargeError):
+                    failure = AnalysisUpdate(status=AnalysisStatus.REJECTED, result={"error": str(e)})
+                else:
+                    failure = AnalysisUpdate(status=AnalysisStatus.FAILED)
+                failure.status_changed_at = datetime.utcnow()
+                failure.expires_at = document_expiry(failure.status, now=failure.status_changed_at)
+                logger.info(f"Attempting to update analysis status to {failure.status} for analysis {analysis_id}")
+                await analysis_repo.update(analysis_obj_id, failure)
+                if current_status and current_status != failure.status:
+                    await stats_service.record_transition(user_id, current_status, failure.status)
+                logger.info(f"Successfully updated analysis status to {failure.status} for analysis {analysis_id}")
             except Exception as db_error:
                 logger.error(f"Failed to update analysis status to FAILED for analysis {analysis_id}: {str(db_error)}")
                 logger.error(f"Database error in failure handler type: {type(db_error).__name__}")
@@ -238,7 +344,56 @@ def analyze_contract(self, analysis_id: str, user_id: str):
                 logger.error(f"Failed to send failure notification email for analysis {analysis_id}: {str(email_error)}")
                 logger.error(f"Failure email error type: {type(email_error).__name__}")
         finally:
+            release_inflight(user_id)
             logger.info(f"Analysis task finished for analysis_id: {analysis_id}")
 
     asyncio.get_event_loop().run_until_complete(main())
-    return {"status": "Completed", "analysis_id": analysis_id}
\ No newline at end of file
+    return {"status": "Completed", "analysis_id": analysis_id}
+
+@celery_app.task
+def reconcile_user_stats(user_id: str = None):
+    """
+    Rebuild per-user dashboard stats from the analyses collection to repair
+    any drift in the incrementally maintained counters.
+    """
+    from app.services.stats_service import StatsService
+
+    async def main():
+        return await StatsService().reconcile(user_id)
+
+    rebuilt = asyncio.get_event_loop().run_until_complete(main())
+    return {"status": "Completed", "users": rebuilt}
+
+@celery_app.task
+def sweep_retention():
+    """Delete expired source files according to the retention policy."""
+    from app.services.retention_service import RetentionService
+
+    async def main():
+        return await RetentionService().sweep()
+
+    result = asyncio.get_event_loop().run_until_complete(main())
+    return {"status": "Completed", **result}
+
+@celery_app.task
+def reindex_clauses(user_id: str = None):
+    """Rebuild the clause search index from completed analyses, e.g. after enabling it on existing data."""
+    from app.db.database import get_collection
+    from app.models.analysis import ContractAnalysis
+    from app.services.clause_index_service import ClauseIndexService
+
+    async def main():
+        clause_index = ClauseIndexService()
+        analyses = await get_collection("analyses")
+        query = {"status": AnalysisStatus.COMPLETED}
+        if user_id:
+            query["user_id"] = user_id
+        indexed = 0
+        async for document in analyses.find(query).batch_size(200):
+            analysis = ContractAnalysis(**document)
+            await clause_index.index_analysis(analysis, analysis.result or {}, expires_at=analysis.expires_at)
+            indexed += 1
+        return indexed
+
+    indexed = asyncio.get_event_loop().run_until_complete(main())
+    return {"status": "Completed", "analyses": indexed}
@@ -70,7 +70,8 @@ function App() {
             const response = await axios.get(`/api/v1/analyses/${analysisId}`);
             if (
               response.data.status === "COMPLETED" ||
-              response.data.status === "FAILED"
+              response.data.status === "FAILED" ||
+              response.data.status === "REJECTED"
             ) {
               clearInterval(interval);
               setAnalysis(response.data);
@@ -277,7 +278,8 @@ function App() {
                       analysis.status === "IN_PROGRESS") && (
                       <Clock className="w-6 h-6 text-blue-500 animate-spin" />
                     )}
-                    {analysis.status === "FAILED" && (
+                    {(analysis.status === "FAILED" ||
+                      analysis.status === "REJECTED") && (
                       <AlertCircle className="w-6 h-6 text-red-500" />
                     )}
                     <CardTitle className="text-xl font-semibold">
@@ -286,7 +288,8 @@ function App() {
                         className={`ml-2 px-3 py-1 rounded-full text-sm font-medium ${
                           analysis.status === "COMPLETED"
                             ? "bg-green-100 text-green-800 dark:bg-green-900/20 dark:text-green-400"
-                            : analysis.status === "FAILED"
+                            : analysis.status === "FAILED" ||
+                              analysis.status === "REJECTED"
                             ? "bg-red-100 text-red-800 dark:bg-red-900/20 dark:text-red-400"
                             : "bg-blue-100 text-blue-800 dark:bg-blue-900/20 dark:text-blue-400"
                         }`}
@@ -364,6 +367,16 @@ function App() {
                       </p>
                     </div>
                   )}
+
+                  {analysis.status === "REJECTED" && (
+                    <div className="text-center py-8">
+                      <AlertCircle className="w-12 h-12 text-red-500 mx-auto mb-4" />
+                      <p className="text-red-600 dark:text-red-400 font-medium">
+                        {analysis.result?.error ||
+                          "This document could not be analyzed."}
+                      </p>
+                    </div>
+                  )}
                 </CardContent>
               </Card>
             )}
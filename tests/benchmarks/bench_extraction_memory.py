@@ -0,0 +1,161 @@
+"""
+Peak-RSS benchmark for contract text extraction on synthetic large documents.
+
+Compares the previous read-everything-then-join approach with the streaming
+extractor in app.worker.extraction. Each case runs in a fresh process so
+ru_maxrss reflects that case alone.
+
+    PYTHONPATH=src/backend python tests/benchmarks/bench_extraction_memory.py --pages 1000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import zipfile
+
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src", "backend"))
+
+LINE = "The Supplier shall indemnify the Customer against all losses arising from any breach of this Agreement."
+LINES_PER_PAGE = 45
+
+
+def write_pdf(path: str, pages: int) -> None:
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for number in range(pages):
+        text = "".join(f"({number + 1}.{i} {LINE}) Tj T* " for i in range(LINES_PER_PAGE))
+        stream = f"BT /F1 8 Tf 10 TL 20 780 Td {text}ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def write_docx(path: str, pages: int) -> None:
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>",
+        )
+        archive.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/>'
+            "</Relationships>",
+        )
+        with archive.open("word/document.xml", "w") as xml:
+            xml.write(f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{ns}"><w:body>'.encode())
+            for number in range(pages):
+                for i in range(LINES_PER_PAGE):
+                    xml.write(f"<w:p><w:r><w:t>{number + 1}.{i} {LINE}</w:t></w:r></w:p>".encode())
+                xml.write(b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+            xml.write(b"</w:body></w:document>")
+
+
+def legacy_extract(path: str) -> int:
+    import docx
+    import pypdf
+
+    if path.endswith(".docx"):
+        text = "\n".join([paragraph.text for paragraph in docx.Document(path).paragraphs])
+    else:
+        with open(path, "rb") as f:
+            text = "\n".join([page.extract_text() for page in pypdf.PdfReader(f).pages])
+    prompt = f"Contract Text:\n{text}"
+    return len(prompt)
+
+
+def streaming_extract(path: str) -> int:
+    from app.services.contract_sections import split_sections
+    from app.worker.extraction import extract_contract_text
+
+    budget = int(float(os.environ["BENCH_MEMORY_BUDGET_MB"]) * 1024 * 1024)
+    with extract_contract_text(path, max_pages=0, max_chars=0, memory_budget_bytes=budget) as extracted:
+        sections = split_sections(extracted.iter_lines())
+    return sum(len(section) for section in sections)
+
+
+def _run(case, path, queue):
+    # Import both stacks up front so the measurement covers extraction only.
+    import docx  # noqa: F401
+    import pypdf  # noqa: F401
+    from app.services.contract_sections import split_sections  # noqa: F401
+    from app.worker.extraction import extract_contract_text  # noqa: F401
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    chars = case(path)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux
+    queue.put((chars, elapsed, (peak - baseline) / 1024))
+
+
+def measure(case, path):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run, args=(case, path, queue))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"{case.__name__} failed on {path}")
+    return queue.get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--memory-budget-mb", type=float, default=1.0, help="Spool budget for the streaming extractor")
+    args = parser.parse_args()
+    os.environ["BENCH_MEMORY_BUDGET_MB"] = str(args.memory_budget_mb)
+
+    with tempfile.TemporaryDirectory() as directory:
+        documents = {
+            "pdf": os.path.join(directory, "synthetic.pdf"),
+            "docx": os.path.join(directory, "synthetic.docx"),
+        }
+        write_pdf(documents["pdf"], args.pages)
+        write_docx(documents["docx"], args.pages)
+
+        print(f"{'document':<8} {'extractor':<10} {'chars':>10} {'seconds':>8} {'peak RSS MB':>12}")
+        for kind, path in documents.items():
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            for name, case in (("legacy", legacy_extract), ("streaming", streaming_extract)):
+                chars, elapsed, peak_mb = measure(case, path)
+                print(f"{kind:<8} {name:<10} {chars:>10} {elapsed:>8.2f} {peak_mb:>12.1f}   ({size_mb:.1f} MB file)")
+
+
+if __name__ == "__main__":
+    main()
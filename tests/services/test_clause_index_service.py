@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from app.models.clause import ClauseRecord
+from app.services import clause_index_service
+from app.services.clause_index_service import ClauseIndexService, embed, normalize_clause
+
+
+class FakeClauseRepository:
+    """In-memory stand-in for ClauseRepository's embedding queries."""
+
+    def __init__(self):
+        self.records = []
+        self.reads = []
+
+    def add(self, user_id, text):
+        record = ClauseRecord(
+            _id=ObjectId(),
+            user_id=user_id,
+            analysis_id=str(ObjectId()),
+            file_name="contract.pdf",
+            position=len(self.records),
+            text=text,
+            normalized_text=normalize_clause(text),
+            embedding=embed(text).tolist(),
+        )
+        self.records.append(record)
+        return record
+
+    async def latest_id(self, user_id):
+        ids = [r.id for r in self.records if r.user_id == user_id]
+        return max(ids) if ids else None
+
+    async def iter_embeddings(self, user_id, after_id=None, batch_size=1000):
+        self.reads.append(after_id)
+        for record in sorted(self.records, key=lambda r: r.id):
+            if record.user_id == user_id and (after_id is None or record.id > after_id):
+                yield {"_id": record.id, "embedding": record.embedding}
+
+    async def get_many(self, ids):
+        by_id = {r.id: r for r in self.records}
+        return [by_id[i] for i in ids if i in by_id]
+
+
+@pytest.fixture
+def service():
+    clause_index_service._vector_cache.clear()
+    index = ClauseIndexService()
+    index.repository = FakeClauseRepository()
+    yield index
+    clause_index_service._vector_cache.clear()
+
+
+def search(service, query, limit=10):
+    return asyncio.run(service.search("user1", query, mode="vector", limit=limit))
+
+
+def test_vector_search_without_clauses_returns_nothing(service):
+    assert search(service, "payment terms") == []
+
+
+def test_vector_search_ranks_closest_clause_first(service):
+    service.repository.add("user1", "The Customer shall pay all invoices within 30 days")
+    service.repository.add("user1", "This Agreement is governed by the laws of England")
+
+    results = search(service, "pay invoices within 30 days")
+
+    assert results[0].text.startswith("The Customer shall pay")
+
+
+def test_new_clauses_are_appended_to_the_cached_matrix(service):
+    service.repository.add("user1", "The Customer shall pay all invoices within 30 days")
+    search(service, "payment")
+    service.repository.add("user1", "Either party may terminate on 60 days notice")
+    service.repository.add("user1", "This Agreement is governed by the laws of England")
+
+    results = search(service, "terminate on notice")
+
+    # The second search only reads clauses newer than the cached one.
+    assert service.repository.reads == [None, service.repository.records[0].id]
+    assert results[0].text.startswith("Either party may terminate")
+    assert clause_index_service._vector_cache["user1"].matrix.shape[0] == 3
+
+
+def test_first_clause_after_an_empty_cache_is_found(service):
+    assert search(service, "payment") == []
+    service.repository.add("user1", "The Customer shall pay all invoices within 30 days")
+
+    results = search(service, "payment within 30 days")
+
+    assert [r.text for r in results] == ["The Customer shall pay all invoices within 30 days"]
+
+
+def test_clause_inserted_during_a_read_is_not_appended_twice(service):
+    repository = service.repository
+    repository.add("user1", "The Customer shall pay all invoices within 30 days")
+    search(service, "payment")
+    repository.add("user1", "Either party may terminate on 60 days notice")
+
+    # A clause lands between the latest_id() query and the embedding read.
+    latest_id = repository.latest_id
+
+    async def latest_id_then_insert(user_id):
+        value = await latest_id(user_id)
+        repository.latest_id = latest_id
+        repository.add(user_id, "Either party may terminate for material breach")
+        return value
+
+    repository.latest_id = latest_id_then_insert
+    search(service, "terminate")
+    results = search(service, "terminate", limit=10)
+
+    assert clause_index_service._vector_cache["user1"].matrix.shape[0] == 3
+    assert len({r.id for r in results}) == len(results) == 3
@@ -0,0 +1,123 @@
+from app.services.contract_sections import (
+    assemble_result,
+    diff_clauses,
+    reusable_sections,
+    section_hash,
+    split_sections,
+)
+
+CONTRACT = """1. Definitions
+"Agreement" means this agreement.
+
+2. Payment
+The Customer shall pay within 30 days.
+
+3. Termination
+Either party may terminate on 60 days notice.
+"""
+
+
+def analyze(text, previous_result=None):
+    """Mirror the worker: hash sections and work out which to reuse and which to analyze."""
+    sections = split_sections(text)
+    hashes = [section_hash(section) for section in sections]
+    previous = reusable_sections(previous_result)
+    reused = {number: previous[h] for number, h in enumerate(hashes, start=1) if h in previous}
+    analyzed = [number for number in range(1, len(sections) + 1) if number not in reused]
+    return hashes, analyzed, reused
+
+
+def first_version():
+    hashes, analyzed, reused = analyze(CONTRACT)
+    parsed = {
+        "summary": "v1",
+        "sections": {"1": ["definitions"], "2": ["payment in 30 days"], "3": ["termination on 60 days"]},
+    }
+    return assemble_result(parsed, hashes, analyzed, reused)
+
+
+def test_split_sections_on_headings():
+    sections = split_sections(CONTRACT)
+    assert len(sections) == 3
+    assert sections[1].startswith("2. Payment")
+
+
+def test_section_hash_ignores_whitespace_and_case():
+    assert section_hash("2. Payment\nThe Customer  shall pay.") == section_hash("2. PAYMENT The customer shall pay.")
+    assert section_hash("2. Payment within 30 days") != section_hash("2. Payment within 45 days")
+
+
+def test_unchanged_sections_are_all_reused():
+    previous = first_version()
+    hashes, analyzed, reused = analyze(CONTRACT, previous)
+
+    assert analyzed == []
+    result = assemble_result({"summary": "v1", "sections": {}}, hashes, analyzed, reused)
+    assert result["clauses"] == previous["clauses"]
+    assert result["sections"] == previous["sections"]
+
+
+def test_changed_section_is_reanalyzed_and_others_reused():
+    previous = first_version()
+    revised = CONTRACT.replace("30 days", "45 days")
+    hashes, analyzed, reused = analyze(revised, previous)
+
+    assert analyzed == [2]
+    assert set(reused) == {1, 3}
+    result = assemble_result({"summary": "v2", "sections": {"2": ["payment in 45 days"]}}, hashes, analyzed, reused)
+    assert result["summary"] == "v2"
+    assert result["clauses"] == ["definitions", "payment in 45 days", "termination on 60 days"]
+    assert [s["hash"] for s in result["sections"]] == hashes
+
+
+def test_reordered_sections_keep_their_clauses():
+    previous = first_version()
+    sections = split_sections(CONTRACT)
+    reordered = "\n\n".join([sections[2], sections[0], sections[1]])
+    hashes, analyzed, reused = analyze(reordered, previous)
+
+    assert analyzed == []
+    result = assemble_result({"summary": "v1", "sections": {}}, hashes, analyzed, reused)
+    assert result["clauses"] == ["termination on 60 days", "definitions", "payment in 30 days"]
+
+
+def test_model_ignoring_section_layout_is_not_reused_next_time():
+    hashes, analyzed, reused = analyze(CONTRACT)
+    result = assemble_result({"summary": "flat", "clauses": ["a", "b"]}, hashes, analyzed, reused)
+
+    assert result["clauses"] == ["a", "b"]
+    assert all(section["clauses"] is None for section in result["sections"])
+    assert reusable_sections(result) == {}
+
+
+def test_model_ignoring_section_layout_keeps_reused_clauses():
+    previous = first_version()
+    hashes, analyzed, reused = analyze(CONTRACT.replace("30 days", "45 days"), previous)
+    result = assemble_result({"summary": "flat", "clauses": ["payment in 45 days"]}, hashes, analyzed, reused)
+
+    assert result["clauses"] == ["payment in 45 days", "definitions", "termination on 60 days"]
+
+
+def test_non_list_section_clauses_are_wrapped():
+    hashes, analyzed, reused = analyze(CONTRACT)
+    result = assemble_result({"summary": "s", "sections": {"1": "definitions"}}, hashes, analyzed, reused)
+
+    assert result["sections"][0]["clauses"] == ["definitions"]
+    assert result["sections"][1]["clauses"] == []
+
+
+def test_diff_clauses():
+    previous = ["Payment in 30 days", {"type": "termination", "notice": 60}, "Governing law: England"]
+    current = ["payment  in 30 DAYS", {"notice": 60, "type": "termination"}, "Governing law: Scotland"]
+
+    diff = diff_clauses(previous, current)
+
+    assert diff == {
+        "added": ["Governing law: Scotland"],
+        "removed": ["Governing law: England"],
+        "unchanged": 2,
+    }
+
+
+def test_diff_clauses_against_empty_previous():
+    assert diff_clauses([], ["a"]) == {"added": ["a"], "removed": [], "unchanged": 0}
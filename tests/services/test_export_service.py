@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from app.models.analysis import AnalysisStatus, ContractAnalysis
+from app.services.export_service import ExportService, decode_cursor, encode_cursor
+
+
+class FakeAnalysisRepository:
+    """In-memory stand-in for AnalysisRepository.iter_for_user with the same _id seek semantics."""
+
+    def __init__(self, analyses):
+        self.analyses = sorted(analyses, key=lambda a: a.id)
+
+    async def iter_for_user(self, user_id, start=None, end=None, from_id=None, inclusive=False, batch_size=500):
+        for analysis in self.analyses:
+            if analysis.user_id != user_id:
+                continue
+            if from_id is not None and (analysis.id < from_id or (analysis.id == from_id and not inclusive)):
+                continue
+            yield analysis
+
+
+def make_analysis(clauses, user_id="user1"):
+    return ContractAnalysis(
+        _id=ObjectId(),
+        user_id=user_id,
+        file_name="contract.pdf",
+        s3_path="uploads/contract.pdf",
+        status=AnalysisStatus.COMPLETED,
+        result={"summary": "s", "clauses": clauses},
+    )
+
+
+@pytest.fixture
+def service():
+    analyses = [
+        make_analysis(["a1", "a2", "a3"]),
+        make_analysis([]),
+        make_analysis(["c1"]),
+        make_analysis(["x1"], user_id="someone-else"),
+        make_analysis(["d1", "d2"]),
+    ]
+    export = ExportService()
+    export.repository = FakeAnalysisRepository(analyses)
+    return export
+
+
+def collect(service, cursor=None, per_clause=False, stop_after=None):
+    async def run():
+        rows = []
+        async for row in service._iter_rows("user1", None, None, cursor, per_clause):
+            rows.append(row)
+            if stop_after is not None and len(rows) == stop_after:
+                break
+        return rows
+    return asyncio.run(run())
+
+
+def row_key(row):
+    return row["id"], row.get("clause_index")
+
+
+@pytest.mark.parametrize("per_clause", [False, True])
+def test_resume_from_any_row_neither_repeats_nor_skips(service, per_clause):
+    full = [row_key(row) for row in collect(service, per_clause=per_clause)]
+
+    for stop_after in range(1, len(full) + 1):
+        first = collect(service, per_clause=per_clause, stop_after=stop_after)
+        rest = collect(service, cursor=first[-1]["cursor"], per_clause=per_clause)
+        assert [row_key(row) for row in first + rest] == full, f"resumed after row {stop_after}"
+
+
+def test_per_analysis_export_includes_every_analysis_once(service):
+    rows = collect(service)
+    assert len(rows) == 4
+    assert [row["clause_count"] for row in rows] == [3, 0, 1, 2]
+
+
+def test_per_clause_export_keeps_analyses_without_clauses(service):
+    rows = collect(service, per_clause=True)
+    assert [row["clause"] for row in rows] == ["a1", "a2", "a3", None, "c1", "d1", "d2"]
+
+
+def test_resume_after_last_clause_moves_to_next_analysis(service):
+    rows = collect(service, per_clause=True)
+    rest = collect(service, cursor=rows[2]["cursor"], per_clause=True)
+    assert [row["clause"] for row in rest] == [None, "c1", "d1", "d2"]
+
+
+def test_resume_after_clause_less_analysis(service):
+    rows = collect(service, per_clause=True)
+    rest = collect(service, cursor=rows[3]["cursor"], per_clause=True)
+    assert [row["clause"] for row in rest] == ["c1", "d1", "d2"]
+
+
+def test_cursor_round_trip():
+    analysis_id = ObjectId()
+    assert decode_cursor(encode_cursor(str(analysis_id))) == (analysis_id, None)
+    assert decode_cursor(encode_cursor(str(analysis_id), 0)) == (analysis_id, 0)
+    assert decode_cursor(encode_cursor(str(analysis_id), 12)) == (analysis_id, 12)
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")